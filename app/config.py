@@ -1,35 +1,86 @@
-import os
 from pathlib import Path
+from .env import get_env
+
+_env = get_env()
 
 # --- Model Config ---
-MODEL_PATH = os.getenv("MODEL_PATH", "yolov8best.pt")
+MODEL_PATH = _env.get("MODEL_PATH", "yolov8best.pt")
+# YOLO çalışma zamanı: "pt" (PyTorch), "onnx" (ONNX Runtime, CPU) veya "engine" (TensorRT FP16, GPU)
+YOLO_BACKEND = _env.get("YOLO_BACKEND", "pt").lower()
+YOLO_EXPORT_IMGSZ = 640  # Export edilen modelin sabit giriş boyutu (Ultralytics varsayılanı)
 LANG_LIST = ['en']  # OCR için dil ayarı
 
+# --- EasyOCR Ayarları ---
+# "1" ise EasyOCR tanıma modeli (CPU) dinamik INT8'e kuantize edilir.
+# Varsayılan kapalı: açmadan önce etiketli plaka setinde doğruluk FP32 ile karşılaştırılmalı
+EASYOCR_QUANTIZE = _env.get("EASYOCR_QUANTIZE", "0") == "1"
+
+# --- PaddleOCR Ayarları ---
+# Plakalar YOLO ile zaten kırpıldığı için PaddleOCR sadece tanıma (recognition) modeliyle çalışır
+PADDLE_REC_MODEL = "en_PP-OCRv4_mobile_rec"  # PaddleOCR 3.x TextRecognition modeli
+
 # --- OCR Karakter Seti Kısıtlaması (Allowlist) ---
 OCR_ALLOWLIST = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
 
+# --- OCR Erken Çıkış ---
+# EasyOCR bu güvenin üstünde geçerli formatta plaka okursa PaddleOCR çalıştırılmaz
+OCR_EARLY_EXIT_CONF = 0.90
+
+# --- Çözülmüş Görsel Cache'i ---
+# Aynı dosya tekrar yüklendiğinde (istemci retry'ları, entegrasyon testleri) çözme + resize atlanır.
+# Her kayıt ~12MB'a kadar (2048x2048 BGR) yer tuttuğu için varsayılan kapalı (0)
+DECODE_CACHE_SIZE = int(_env.get("DECODE_CACHE_SIZE", "0"))
+
+# --- Plaka Crop Ön İşleme ---
+# "1" ise crop sadece padding + resize ile renkli olarak OCR'a verilir (CLAHE/sharpen/threshold atlanır).
+# Varsayılan kapalı: açmadan önce etiketli plaka setinde ensemble_source dağılımı ve doğruluk karşılaştırılmalı
+USE_FAST_PREPROCESS = _env.get("USE_FAST_PREPROCESS", "0") == "1"
+
+# --- OCR Sonuç Cache'i ---
+OCR_CACHE_SIZE = 1024  # Aynı plaka crop'u için saklanacak maksimum OCR sonucu
+
+# --- OCR Eşzamanlılığı ---
+# Aynı anda OCR aşamasını çalıştırabilecek istek sayısı (CPU'yu torch/paddle thread'leriyle taşırmamak için)
+OCR_CONCURRENCY = int(_env.get("OCR_CONCURRENCY", "2"))
+
 # --- API Ayarları ---
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+MAX_REQUEST_BODY_SIZE = MAX_FILE_SIZE + 1024 * 1024  # Multipart başlıkları için 1MB pay
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Upload'lar bu boyutta parçalar halinde okunur
 ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.bmp', '.tiff', '.webp'}
 
 # --- Performans ve Görsel Ayarları ---
 MAX_IMAGE_DIMENSION = 2048
 THUMBNAIL_SIZE = (1920, 1920)
 JPEG_QUALITY = 85
+# "1" ise plaka crop ön işleme zinciri OpenCV T-API (OpenCL, cv2.UMat) ile çalışır.
+# Varsayılan kapalı: küçük crop'larda GPU'ya kopyalama maliyeti kazancı geçebilir, önce ölçülmeli
+PREPROCESS_OPENCL = _env.get("PREPROCESS_OPENCL", "0") == "1"
 
 # --- YOLO Algılama Ayarı ---
 DETECTION_MIN_CONFIDENCE = 0.25
 
+# --- YOLO Mikro-Batch Ayarları ---
+YOLO_MAX_BATCH_SIZE = int(_env.get("YOLO_MAX_BATCH_SIZE", "8"))  # Tek çağrıda işlenecek maksimum görsel
+YOLO_BATCH_WAIT_MS = 10  # Batch doldurmak için beklenecek maksimum süre
+
+# --- Veritabanı ---
+# "1" ise tablolar uygulama açılışında da (stamp kontrolüyle) oluşturulur; normalde scripts/init_db.py ile yapılır
+RUN_DB_INIT = _env.get("RUN_DB_INIT", "0") == "1"
+
 # --- Yollar ve Klasörler ---
 BASE_DIR = Path(__file__).parent.parent
 UPLOAD_DIR = BASE_DIR / "app" / "static" / "uploads"
 UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
 
 # --- AWS S3 Ayarları ---
-AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID")
-AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
-AWS_S3_BUCKET_NAME = os.getenv("AWS_S3_BUCKET_NAME")
-AWS_S3_REGION = os.getenv("AWS_S3_REGION")
+AWS_ACCESS_KEY_ID = _env.get("AWS_ACCESS_KEY_ID")
+AWS_SECRET_ACCESS_KEY = _env.get("AWS_SECRET_ACCESS_KEY")
+AWS_S3_BUCKET_NAME = _env.get("AWS_S3_BUCKET_NAME")
+AWS_S3_REGION = _env.get("AWS_S3_REGION")
 
 # (Opsiyonel) S3 URL template (eğer özel domain yoksa)
-AWS_S3_BASE_URL = f"https://{AWS_S3_BUCKET_NAME}.s3.{AWS_S3_REGION}.amazonaws.com"
+AWS_S3_BASE_URL = (
+    f"https://{AWS_S3_BUCKET_NAME}.s3.{AWS_S3_REGION}.amazonaws.com"
+    if AWS_S3_BUCKET_NAME and AWS_S3_REGION else None
+)
@@ -0,0 +1,15 @@
+# app/env.py
+
+import os
+from functools import lru_cache
+from types import MappingProxyType
+from dotenv import load_dotenv
+
+@lru_cache(maxsize=None)
+def get_env() -> MappingProxyType:
+    """
+    .env dosyasını süreç başına sadece bir kez okur ve ortam değişkenlerinin
+    salt-okunur bir kopyasını döndürür. Tüm modüller ayarları buradan alır.
+    """
+    load_dotenv()
+    return MappingProxyType(dict(os.environ))
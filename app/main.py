@@ -2,25 +2,122 @@
 
 import os
 import time
-from fastapi import FastAPI
+import logging
+import orjson
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
-from .database import engine, Base
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
+from .database import init_db_if_needed
+from .config import MAX_FILE_SIZE, MAX_REQUEST_BODY_SIZE, RUN_DB_INIT
+from .exceptions import APIException, FileSizeError
 from .predict import router as predict_router
+from .model import model_manager, yolo_batcher
+from .ocr import get_ocr_manager
+from . import preprocess
 
-# Ortam değişkenlerini yükle (.env)
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# SQLAlchemy tablolarını oluştur
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Sunucu trafik almadan önce modelleri ısıt"""
+    # Tablolar normalde deploy sırasında scripts/init_db.py ile oluşturulur;
+    # ilk kurulum kolaylığı için RUN_DB_INIT ayarlıysa burada da oluşturulabilir.
+    # Stamp dosyası sayesinde model tanımları değişmedikçe tekrar eden boot'larda DDL kontrolü yapılmaz
+    if RUN_DB_INIT and init_db_if_needed():
+        logger.info("Database tables created")
+
+    # İlk /predict isteği CUDA/graph (ve OpenCL kernel) derleme maliyetini ödemesin
+    # Her ısıtma ayrı: biri başarısız olursa diğerleri yine de çalışır
+    try:
+        model_manager.warmup(batch_size=yolo_batcher.max_batch_size)
+    except Exception as e:
+        logger.warning(f"YOLO warmup failed: {e}")
+    try:
+        preprocess.warmup()
+    except Exception as e:
+        logger.warning(f"Preprocess warmup failed: {e}")
+    try:
+        get_ocr_manager().warmup()
+    except Exception as e:
+        logger.warning(f"OCR warmup failed: {e}")
+
+    yolo_batcher.start()
+    yield
+    await yolo_batcher.stop()
+
+class UploadSizeLimitMiddleware:
+    """
+    Büyük upload'ları bellekte biriktirmeden reddeden saf ASGI middleware.
+    Content-Length varsa gövde hiç okunmadan 413 döner; yoksa (chunked upload)
+    gövde akarken sayılır ve sınır aşıldığı anda okuma kesilip 413 döndürülür.
+    """
+
+    def __init__(self, app, max_body_size: int):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    def _too_large_response(self):
+        return JSONResponse(
+            status_code=413,
+            content={"detail": f"File size exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit"}
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > self.max_body_size:
+            await self._too_large_response()(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    exceeded = True
+                    raise FileSizeError(f"File size exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit")
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if exceeded:
+                # Uygulama okuma hatasını kendi yanıtına (ör. 400) çevirdiyse onun yerine 413 gönder
+                if message["type"] == "http.response.start" and not response_started:
+                    response_started = True
+                    await self._too_large_response()(scope, receive, send)
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except FileSizeError:
+            if not response_started:
+                await self._too_large_response()(scope, receive, send)
 
 # FastAPI uygulaması başlatılıyor
 app = FastAPI(
     title="Plaka Tespit API",
     description="YOLOv8, EasyOCR ve PostgreSQL ile plaka tespiti ve okuma",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Büyük upload'ları (Content-Length'e bakarak veya akış sırasında sayarak) bellekte biriktirmeden reddet.
+# CORS'tan önce eklenir: son eklenen middleware en dışta olduğu için CORS 413 yanıtını da sarar
+app.add_middleware(UploadSizeLimitMiddleware, max_body_size=MAX_REQUEST_BODY_SIZE)
+
 # CORS middleware EKLENDİ!
 app.add_middleware(
     CORSMiddleware,
@@ -30,23 +127,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# API exception'larını kendi status kodlarıyla döndür
+@app.exception_handler(APIException)
+async def api_exception_handler(request: Request, exc: APIException):
+    return JSONResponse(status_code=exc.status_code, content={"detail": exc.message})
+
 # Prediction ve batch endpointlerini import edilen router ile ekle
 app.include_router(predict_router)
 
 # Sağlık kontrolü ve bilgilendirme endpointleri
+# Sabit cevaplar import sırasında bir kez serialize edilir
+_ROOT_BYTES = orjson.dumps({
+    "message": "Plaka Tespit API çalışıyor",
+    "status": "healthy",
+    "version": "2.0.0"
+})
+# /health cevabında sadece timestamp değişir; geri kalanı önceden hazır
+_HEALTH_PREFIX = orjson.dumps({
+    "status": "healthy",
+    "service": "plaka-tespit-api",
+    "version": "2.0.0"
+})[:-1] + b',"timestamp":'
+
 @app.get("/")
 async def root():
-    return {
-        "message": "Plaka Tespit API çalışıyor",
-        "status": "healthy",
-        "version": "2.0.0"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 @app.get("/health")
 async def health_check():
-    return {
-        "status": "healthy",
-        "timestamp": time.time(),
-        "service": "plaka-tespit-api",
-        "version": "2.0.0"
-    }
+    return Response(content=_HEALTH_PREFIX + orjson.dumps(time.time()) + b"}", media_type="application/json")
@@ -1,29 +1,169 @@
-from ultralytics import YOLO
+import asyncio
 import logging
-from .config import MODEL_PATH
+import threading
+import numpy as np
+from contextlib import suppress
+from pathlib import Path
+from .config import (
+    MODEL_PATH, YOLO_BACKEND, YOLO_EXPORT_IMGSZ, YOLO_MAX_BATCH_SIZE, YOLO_BATCH_WAIT_MS
+)
 from .exceptions import ModelLoadError
 
 logger = logging.getLogger(__name__)
 
+# Desteklenen export formatları ve Ultralytics'in ürettiği dosya uzantıları
+EXPORT_SUFFIXES = {"onnx": ".onnx", "engine": ".engine"}
+
 class ModelManager:
+    """
+    YOLO modelini ilk kullanımda yükler. ultralytics (torch ile birlikte) import'u
+    saniyeler sürdüğü için modül import'unda değil, get_model() ilk çağrıldığında yapılır.
+    """
+
     def __init__(self):
         self.model = None
-        self._load_model()
+        # 'plate' sınıfının id'leri; model yüklenirken bir kez hesaplanır
+        self.plate_class_ids = None
+        self._lock = threading.Lock()
 
     def _load_model(self):
         """Load YOLO model with error handling"""
         try:
+            from ultralytics import YOLO
             logger.info(f"Loading YOLO model from {MODEL_PATH}")
-            self.model = YOLO(MODEL_PATH)
+            model = YOLO(MODEL_PATH)
             logger.info("YOLO model loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load YOLO model: {e}")
             raise ModelLoadError(f"Failed to load YOLO model: {str(e)}")
-    
+
+        if YOLO_BACKEND in EXPORT_SUFFIXES:
+            model = self._load_exported_model(model, YOLO_BACKEND)
+        self.plate_class_ids = np.array(
+            [class_id for class_id, name in model.names.items() if name == 'plate'], dtype=np.int64
+        )
+        self.model = model
+
+    def _load_exported_model(self, model, backend: str):
+        """
+        Modeli ONNX/TensorRT formatına bir kez export eder (diskte cache'lenir)
+        ve sonraki çıkarımlar için derlenmiş runtime'ı yükler.
+        Export başarısız olursa PyTorch modeliyle devam edilir.
+        """
+        from ultralytics import YOLO
+        cached_path = Path(MODEL_PATH).with_suffix(EXPORT_SUFFIXES[backend])
+        try:
+            if not cached_path.exists():
+                logger.info(f"Exporting YOLO model to {backend} ({cached_path})")
+                exported = model.export(
+                    format=backend,
+                    half=(backend == "engine"),  # FP16 sadece GPU/TensorRT'de anlamlı
+                    imgsz=YOLO_EXPORT_IMGSZ,
+                    dynamic=False,
+                    simplify=True
+                )
+                cached_path = Path(exported)
+            exported_model = YOLO(str(cached_path), task="detect")
+            logger.info(f"YOLO {backend} model loaded from {cached_path}")
+            return exported_model
+        except Exception as e:
+            logger.warning(f"YOLO {backend} export/load failed, using PyTorch model: {e}")
+            return model
+
+    def warmup(self, batch_size: int = 1):
+        """
+        İlk isteğin soğuk başlangıç maliyetini ödememesi için boş görsellerle çıkarım yap.
+        batch_size > 1 ise batcher'ın kullandığı tam batch boyutu da ayrıca ısıtılır.
+        """
+        model = self.get_model()
+        dummy = np.zeros((YOLO_EXPORT_IMGSZ, YOLO_EXPORT_IMGSZ, 3), dtype=np.uint8)
+        model(dummy, verbose=False)
+        if batch_size > 1:
+            model([dummy] * batch_size, verbose=False)
+        logger.info(f"YOLO model warmed up (batch_size={batch_size})")
+
     def get_model(self):
         if self.model is None:
-            raise ModelLoadError("YOLO model not loaded")
+            with self._lock:
+                if self.model is None:
+                    self._load_model()
         return self.model
 
+    def predict(self, images):
+        """
+        Modeli (gerekirse yükleyerek) çalıştır. Model yükleme de çıkarım ile birlikte
+        çağıranın thread'inde yapılır; event loop'tan to_thread ile çağrılmalıdır.
+        """
+        return self.get_model()(images)
+
+class YoloBatcher:
+    """
+    Eşzamanlı isteklerin YOLO çağrılarını tek bir kuyrukta toplar.
+    Tek bir arka plan görevi modele erişimi sıralar ve kısa bir pencerede
+    biriken görselleri tek bir batch çağrısında işler.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: int):
+        # Sabit girişli export edilmiş modeller (ONNX/TensorRT) batch=1 ile derlenir
+        self.max_batch_size = 1 if YOLO_BACKEND in EXPORT_SUFFIXES else max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000
+        self._queue = None
+        self._task = None
+
+    def start(self):
+        """Kuyruğu ve işleyici görevi çalışan event loop üzerinde başlat"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._process_loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            self._queue = None
+
+    async def submit(self, image):
+        """Görseli kuyruğa ekle ve ona ait YOLO sonucunu (Results) döndür"""
+        if self._queue is None:
+            # Batcher başlatılmadıysa (ör. lifespan olmadan) doğrudan çalıştır
+            results = await asyncio.to_thread(model_manager.predict, image)
+            return results[0]
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, future))
+        return await future
+
+    async def _collect_batch(self):
+        """İlk öğeyi bekle, ardından pencere dolana kadar gelenleri topla"""
+        loop = asyncio.get_running_loop()
+        items = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(items) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                items.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return items
+
+    async def _process_loop(self):
+        while True:
+            items = await self._collect_batch()
+            images = [image for image, _ in items]
+            try:
+                results = await asyncio.to_thread(model_manager.predict, images)
+            except Exception as e:
+                logger.error(f"YOLO batch inference failed: {e}")
+                for _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(items, results):
+                if not future.done():
+                    future.set_result(result)
+
 # Global model manager instance
 model_manager = ModelManager()
+yolo_batcher = YoloBatcher(YOLO_MAX_BATCH_SIZE, YOLO_BATCH_WAIT_MS)
@@ -1,16 +1,20 @@
-import easyocr
-from paddleocr import PaddleOCR
-import re
+import os
 import cv2
 import numpy as np
 import logging
 from PIL import Image
 import threading
-from collections import Counter
+import hashlib
+from collections import Counter, OrderedDict
+from functools import lru_cache
+from operator import itemgetter
+import heapq
 import time
 
 # YENİ IMPORT - Enhanced functionality için
 from .ocr_enhancement import enhanced_clean_text, enhanced_validation, smart_ensemble_decision, format_plate_with_spaces
+from .config import OCR_CACHE_SIZE, OCR_EARLY_EXIT_CONF, PADDLE_REC_MODEL, EASYOCR_QUANTIZE
+from .env import get_env
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +36,11 @@ class OCRManager:
     
     def __init__(self):
         if not self._initialized:
+            # PaddleOCR predictor'ı giriş/çıkış tensor handle'larını paylaşır, thread-safe değildir
+            self._paddle_lock = threading.Lock()
             try:
+                # Ağır kütüphaneler (torch, paddle) sadece OCR gerçekten kullanıldığında import edilir
+                import easyocr
                 logger.info("Initializing detailed OCR engines...")
                 # EasyOCR reader - detaylı sonuç için
                 self.easyocr_reader = easyocr.Reader(
@@ -40,207 +48,331 @@ class OCRManager:
                     gpu=False,
                     verbose=False
                 )
-                # PaddleOCR - hızlı ayarlar
-                self.paddle_ocr = PaddleOCR(use_angle_cls=False, lang='en')
+                self._configure_easyocr_cpu()
+                # PaddleOCR - detektörsüz, sadece tanıma; CPU'da MKL-DNN
+                self.paddle_ocr, self._paddle_v3 = self._create_paddle_recognizer()
                 self._initialized = True
                 logger.info("OCR engines initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize OCR engines: {e}")
                 raise
 
-# Global OCR manager instance
-ocr_manager = OCRManager()
+    def _configure_easyocr_cpu(self):
+        """CPU thread ayarları ve (opsiyonel) tanıma modelinin INT8 dinamik kuantizasyonu"""
+        import torch
+        torch.set_num_threads(os.cpu_count())
+        try:
+            # Sadece süreçte henüz paralel iş başlamadıysa ayarlanabilir
+            torch.set_num_interop_threads(1)
+        except RuntimeError as e:
+            logger.debug(f"Could not set torch inter-op threads: {e}")
+
+        if EASYOCR_QUANTIZE:
+            try:
+                self.easyocr_reader.recognizer = torch.ao.quantization.quantize_dynamic(
+                    self.easyocr_reader.recognizer,
+                    {torch.nn.Linear, torch.nn.LSTM},
+                    dtype=torch.qint8
+                )
+                logger.info("EasyOCR recognizer quantized to INT8")
+            except Exception as e:
+                logger.warning(f"EasyOCR quantization failed, using FP32 recognizer: {e}")
+
+    @staticmethod
+    def _create_paddle_recognizer():
+        """
+        PaddleOCR tanıma modelini oluştur. Giriş YOLO'nun kırptığı plaka olduğu için
+        metin detektörü çalıştırılmaz. GPU sadece CUDA_VISIBLE_DEVICES ayarlıysa kullanılır.
+        (recognizer, is_v3) döner.
+        """
+        use_gpu = bool(get_env().get("CUDA_VISIBLE_DEVICES"))
+        try:
+            # PaddleOCR 3.x: tek başına tanıma modeli
+            from paddleocr import TextRecognition
+            recognizer = TextRecognition(
+                model_name=PADDLE_REC_MODEL,
+                device="gpu" if use_gpu else "cpu",
+                enable_mkldnn=True,
+                cpu_threads=os.cpu_count()
+            )
+            return recognizer, True
+        except ImportError:
+            # PaddleOCR 2.x: det=False ile sadece tanıma
+            from paddleocr import PaddleOCR
+            recognizer = PaddleOCR(
+                use_angle_cls=False,
+                lang='en',
+                det=False,
+                rec=True,
+                use_gpu=use_gpu,
+                enable_mkldnn=True,
+                cpu_threads=os.cpu_count()
+            )
+            return recognizer, False
+
+    def paddle_recognize(self, img):
+        """Kırpılmış plaka görüntüsünü PaddleOCR ile oku, (metin, güven) çiftleri döndür"""
+        return self.paddle_recognize_batch([img])[0]
+
+    def paddle_recognize_batch(self, imgs):
+        """
+        Birden fazla plaka crop'unu PaddleOCR ile oku; her crop için (metin, güven) çiftleri döndür.
+        Predictor paylaşıldığı için çağrılar kilit altında sıralanır; 3.x'te tüm crop'lar tek predict çağrısıdır.
+        """
+        with self._paddle_lock:
+            if self._paddle_v3:
+                # Tanıma modeli 3 kanallı giriş bekler
+                batch = [cv2.cvtColor(img, cv2.COLOR_GRAY2BGR) if img.ndim == 2 else img for img in imgs]
+                return [[(res['rec_text'], res['rec_score'])] for res in self.paddle_ocr.predict(batch)]
+            # 2.x det=False çıktısı: [[(metin, güven), ...]] (tek görsel alır)
+            pairs_list = []
+            for img in imgs:
+                result = self.paddle_ocr.ocr(img, det=False, cls=False)
+                pairs_list.append([pair for line in (result or []) if line for pair in line])
+            return pairs_list
+
+    def warmup(self):
+        """Her iki OCR motorunu boş plaka crop'ları ile ısıt (graph tracing, bellek ayırma)"""
+        dummy = np.zeros((64, 192, 3), dtype=np.uint8)
+        self.easyocr_reader.readtext(dummy, allowlist=PLAKA_ALLOWLIST)
+        # Çok plakalı görsellerde kullanılan batched yolu da ısıt
+        self.easyocr_reader.readtext_batched([dummy, dummy], batch_size=2, allowlist=PLAKA_ALLOWLIST)
+        self.paddle_recognize(dummy)
+        logger.info("OCR engines warmed up")
+
+@lru_cache(maxsize=None)
+def get_ocr_manager() -> OCRManager:
+    """OCR motorlarını ilk kullanımda başlatan erişimci"""
+    return OCRManager()
+
+class OCRResultCache:
+    """
+    Aynı plaka crop'u tekrar geldiğinde (duran araç, tekrar yüklenen görsel)
+    OCR motorlarını yeniden çalıştırmamak için thread-safe LRU cache.
+    Anahtar crop piksellerinin birebir hash'idir; perceptual hash kullanılmaz çünkü
+    tek karakteri farklı iki plaka aynı hash'e düşüp yanlış sonuç döndürebilir.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(img) -> bytes:
+        img = np.ascontiguousarray(img)
+        digest = hashlib.blake2b(img, digest_size=16)
+        digest.update(str(img.shape).encode())
+        return digest.digest()
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+            if result is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(result)
+
+    def put(self, key, result):
+        with self._lock:
+            self._entries[key] = dict(result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+ocr_result_cache = OCRResultCache(OCR_CACHE_SIZE)
+
+def _build_blur_sharpen_kernel():
+    """3x3 Gaussian blur ve 3x3 keskinleştirme çekirdeklerini tek bir 5x5 çekirdekte birleştir"""
+    gauss_1d = cv2.getGaussianKernel(3, 0)
+    gauss = gauss_1d @ gauss_1d.T
+    sharpen = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]], dtype=np.float64)
+    fused = np.zeros((5, 5), dtype=np.float64)
+    for y in range(3):
+        for x in range(3):
+            fused[y:y + 3, x:x + 3] += sharpen[y, x] * gauss
+    return fused.astype(np.float32)
+
+# Modül yüklenirken bir kez oluşturulan filtre.
+# İki geçişli GaussianBlur + filter2D ile bit düzeyinde aynı değildir: aradaki uint8 yuvarlama/doyma
+# ve 5x5 çekirdeğin kenar (REFLECT_101) davranışı farklı olduğundan pikselleri birkaç gri seviye değişir
+_BLUR_SHARPEN_KERNEL = _build_blur_sharpen_kernel()
+
+# enhance_plate_image ara sonuçları ve CLAHE nesnesi için thread başına tekrar kullanılan durum
+# (CLAHE.apply nesne içi buffer'lara yazdığı için thread'ler arasında paylaşılamaz)
+_scratch_buffers = threading.local()
+
+def _clahe():
+    clahe = getattr(_scratch_buffers, 'clahe_obj', None)
+    if clahe is None:
+        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
+        _scratch_buffers.clahe_obj = clahe
+    return clahe
+
+def _scratch(name, h, w):
+    """Thread'e ait, gerektiğinde büyütülen uint8 buffer'ın h x w görünümünü döndür"""
+    buf = getattr(_scratch_buffers, name, None)
+    if buf is None or buf.shape[0] < h or buf.shape[1] < w:
+        old_h, old_w = buf.shape if buf is not None else (0, 0)
+        buf = np.empty((max(h, old_h), max(w, old_w)), dtype=np.uint8)
+        setattr(_scratch_buffers, name, buf)
+    return buf[:h, :w]
 
 def enhance_plate_image(img):
-    """Plaka görüntüsünü OCR için optimize et"""
-    # Kontrast artırma
+    """Plaka görüntüsünü OCR için optimize et (BGR veya gri giriş, tek kanallı gri görüntü döner)"""
+    h, w = img.shape[:2]
+    
+    # Kontrast artırma - pipeline OpenCV'nin doğal formatı olan BGR'de kalır
     if len(img.shape) == 3:
-        gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY, dst=_scratch('gray', h, w))
     else:
-        gray = img.copy()
-    
+        gray = img
+
     # CLAHE uygula
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8, 8))
-    enhanced = clahe.apply(gray)
-    
-    # Gaussian blur ile gürültü azalt
-    blurred = cv2.GaussianBlur(enhanced, (3, 3), 0)
+    enhanced = _clahe().apply(gray, dst=_scratch('clahe', h, w))
+
+    # Gürültü azaltma + keskinleştirme tek geçişte (birleşik 5x5 çekirdek)
+    # Her iki OCR motoru da tek kanallı girişi kabul ediyor, RGB'ye geri dönüştürmeye gerek yok.
+    # Çıktı çağırana ait olduğu için (batch'te birden fazla crop tutulur) yeni bir array'e yazılır
+    return cv2.filter2D(enhanced, -1, _BLUR_SHARPEN_KERNEL)
+
+# Bu güvenin altındaki OCR adayları atılır; sonuçta en iyi OCR_TOP_K aday tutulur
+OCR_MIN_CONFIDENCE = 0.3
+OCR_TOP_K = 5
+
+# EasyOCR okuma - optimize edilmiş parametreler (tekli ve batch çağrılarda ortak)
+EASYOCR_READ_PARAMS = dict(
+    detail=True,
+    allowlist=PLAKA_ALLOWLIST,
+    width_ths=0.5,
+    height_ths=0.5,
+    paragraph=False,
+    workers=0,
+    text_threshold=0.5,
+    low_text=0.2,
+    link_threshold=0.2,
+    canvas_size=1280,
+    mag_ratio=1.0
+)
+
+def _empty_ocr_result(processing_time):
+    return {
+        'text': '',
+        'confidence': 0.0,
+        'processing_time': processing_time,
+        'all_results': []
+    }
+
+def _select_ocr_candidates(candidates, start_time):
+    """
+    (metin, güven, bbox) adaylarını eşikle filtrele ve en yüksek güvenli
+    OCR_TOP_K tanesini döndür. Tüm listeyi sıralamak yerine heapq.nlargest
+    kullanılır; sözlükler sadece seçilen adaylar için oluşturulur.
+    """
+    filtered = (
+        (text.strip(), confidence, bbox)
+        for text, confidence, bbox in candidates
+        if isinstance(text, str) and confidence > OCR_MIN_CONFIDENCE and text.strip()
+    )
+    # nlargest, sorted(..., reverse=True) gibi eşit skorlarda orijinal sırayı korur
+    top = heapq.nlargest(OCR_TOP_K, filtered, key=itemgetter(1))
     
-    # Keskinleştirme
-    kernel = np.array([[-1, -1, -1], [-1, 9, -1], [-1, -1, -1]])
-    sharpened = cv2.filter2D(blurred, -1, kernel)
+    processing_time = (time.perf_counter_ns() - start_time) / 1e9
     
-    # RGB'ye geri dönüştür
-    return cv2.cvtColor(sharpened, cv2.COLOR_GRAY2RGB)
+    # En iyi sonucu döndür
+    if not top:
+        return _empty_ocr_result(processing_time)
+    all_results = [
+        {'text': text, 'confidence': confidence} if bbox is None
+        else {'text': text, 'confidence': confidence, 'bbox': bbox}
+        for text, confidence, bbox in top
+    ]
+    return {
+        'text': top[0][0],
+        'confidence': top[0][1],
+        'processing_time': processing_time,
+        'all_results': all_results
+    }
+
+def _parse_easyocr_results(results, start_time):
+    """EasyOCR readtext çıktısını (bbox, metin, güven) en iyi sonuç + adaylar formatına çevir"""
+    return _select_ocr_candidates(
+        ((result[1], result[2], result[0]) for result in results if len(result) >= 3),
+        start_time
+    )
+
+def _pad_to_common_shape(imgs):
+    """readtext_batched aynı boyutlu görseller ister; oranı bozmamak için resize yerine kenar uzat"""
+    max_h = max(img.shape[0] for img in imgs)
+    max_w = max(img.shape[1] for img in imgs)
+    return [
+        cv2.copyMakeBorder(img, 0, max_h - img.shape[0], 0, max_w - img.shape[1], cv2.BORDER_REPLICATE)
+        for img in imgs
+    ]
 
-def easyocr_plate(img):
-    """EasyOCR ile gelişmiş okuma - Detaylı sonuç"""
-    start_time = time.time()
+def easyocr_plate(img, enhanced=False):
+    """EasyOCR ile gelişmiş okuma - Detaylı sonuç (enhanced=True ise img zaten iyileştirilmiştir)"""
+    start_time = time.perf_counter_ns()
     try:
         # Görüntüyü enhance et
-        enhanced_img = enhance_plate_image(img)
-        
-        # EasyOCR okuma - optimize edilmiş parametreler
-        results = ocr_manager.easyocr_reader.readtext(
-            enhanced_img,
-            detail=True,
-            allowlist=PLAKA_ALLOWLIST,
-            width_ths=0.5,
-            height_ths=0.5,
-            paragraph=False,
-            batch_size=1,
-            workers=0,
-            text_threshold=0.5,
-            low_text=0.2,
-            link_threshold=0.2,
-            canvas_size=1280,
-            mag_ratio=1.0
-        )
-        
-        # Sonuçları işle
-        texts = []
-        for result in results:
-            if len(result) >= 3:
-                bbox = result[0]        # Koordinatlar
-                text = result[1]        # Metin
-                confidence = result[2]  # Güven skoru
-                
-                if isinstance(text, str) and text.strip() and confidence > 0.3:
-                    texts.append({
-                        'text': text.strip(),
-                        'confidence': confidence,
-                        'bbox': bbox
-                    })
-        
-        # En yüksek güven skoruna göre sırala
-        texts.sort(key=lambda x: x['confidence'], reverse=True)
+        enhanced_img = img if enhanced else enhance_plate_image(img)
         
-        processing_time = time.time() - start_time
-        
-        # En iyi sonucu döndür
-        if texts:
-            best_result = texts[0]
-            return {
-                'text': best_result['text'],
-                'confidence': best_result['confidence'],
-                'processing_time': processing_time,
-                'all_results': texts
-            }
-        else:
-            return {
-                'text': '',
-                'confidence': 0.0,
-                'processing_time': processing_time,
-                'all_results': []
-            }
+        results = get_ocr_manager().easyocr_reader.readtext(enhanced_img, batch_size=1, **EASYOCR_READ_PARAMS)
+        return _parse_easyocr_results(results, start_time)
         
     except Exception as e:
-        processing_time = time.time() - start_time
+        processing_time = (time.perf_counter_ns() - start_time) / 1e9
         logger.error(f"EasyOCR Error: {e}")
-        return {
-            'text': '',
-            'confidence': 0.0,
-            'processing_time': processing_time,
-            'all_results': []
-        }
-
-def paddleocr_plate(img):
-    """PaddleOCR ile okuma - Detaylı sonuç"""
-    start_time = time.time()
+        return _empty_ocr_result(processing_time)
+
+def easyocr_plates_batch(imgs, enhanced=False):
+    """Birden fazla plaka crop'unu tek bir EasyOCR readtext_batched çağrısında oku"""
+    start_time = time.perf_counter_ns()
     try:
-        # Görüntüyü enhance et
-        enhanced_img = enhance_plate_image(img)
+        enhanced_imgs = imgs if enhanced else [enhance_plate_image(img) for img in imgs]
+        batch = _pad_to_common_shape(enhanced_imgs)
         
-        # BGR formatına çevir (PaddleOCR için)
-        if len(enhanced_img.shape) == 3:
-            img_for_paddle = cv2.cvtColor(enhanced_img, cv2.COLOR_RGB2BGR)
-        else:
-            img_for_paddle = enhanced_img
-        
-        result = ocr_manager.paddle_ocr.ocr(img_for_paddle)
-        
-        texts = []
-        
-        if result is not None and result:
-            # PaddleX format işleme
-            for line_result in result:
-                try:
-                    # PaddleX format - OCRResult object
-                    if hasattr(line_result, 'rec_texts') and hasattr(line_result, 'rec_scores'):
-                        rec_texts = line_result.rec_texts
-                        rec_scores = line_result.rec_scores
-                        
-                        if rec_texts and rec_scores:
-                            for text, score in zip(rec_texts, rec_scores):
-                                if isinstance(text, str) and text.strip() and score > 0.3:
-                                    texts.append({
-                                        'text': text.strip(),
-                                        'confidence': score
-                                    })
-                    
-                    # Dictionary format fallback
-                    elif isinstance(line_result, dict):
-                        if 'rec_texts' in line_result and 'rec_scores' in line_result:
-                            rec_texts = line_result['rec_texts']
-                            rec_scores = line_result['rec_scores']
-                            
-                            if rec_texts and rec_scores:
-                                for text, score in zip(rec_texts, rec_scores):
-                                    if isinstance(text, str) and text.strip() and score > 0.3:
-                                        texts.append({
-                                            'text': text.strip(),
-                                            'confidence': score
-                                        })
-                    
-                    # Legacy format fallback
-                    elif isinstance(line_result, list):
-                        for detection in line_result:
-                            if isinstance(detection, list) and len(detection) >= 2:
-                                text_info = detection[1]
-                                if isinstance(text_info, (tuple, list)) and len(text_info) >= 2:
-                                    text = text_info[0]
-                                    confidence = text_info[1]
-                                    if isinstance(text, str) and text.strip() and confidence > 0.3:
-                                        texts.append({
-                                            'text': text.strip(),
-                                            'confidence': confidence
-                                        })
-                            
-                except Exception as e:
-                    logger.debug(f"Error processing PaddleOCR result: {e}")
-                    continue
-        
-        # En yüksek güven skoruna göre sırala
-        texts.sort(key=lambda x: x['confidence'], reverse=True)
+        results_list = get_ocr_manager().easyocr_reader.readtext_batched(
+            batch, batch_size=len(batch), **EASYOCR_READ_PARAMS
+        )
+        return [_parse_easyocr_results(results, start_time) for results in results_list]
         
-        processing_time = time.time() - start_time
+    except Exception as e:
+        processing_time = (time.perf_counter_ns() - start_time) / 1e9
+        logger.error(f"EasyOCR batch Error: {e}")
+        return [_empty_ocr_result(processing_time) for _ in imgs]
+
+def paddleocr_plate(img, enhanced=False):
+    """PaddleOCR ile okuma - Detaylı sonuç (enhanced=True ise img zaten iyileştirilmiştir)"""
+    start_time = time.perf_counter_ns()
+    try:
+        # Görüntüyü enhance et
+        enhanced_img = img if enhanced else enhance_plate_image(img)
         
-        # En iyi sonucu döndür
-        if texts:
-            best_result = texts[0]
-            return {
-                'text': best_result['text'],
-                'confidence': best_result['confidence'],
-                'processing_time': processing_time,
-                'all_results': texts
-            }
-        else:
-            return {
-                'text': '',
-                'confidence': 0.0,
-                'processing_time': processing_time,
-                'all_results': []
-            }
+        # Detektörsüz tanıma: çıktı her zaman (metin, güven) çiftleri
+        pairs = get_ocr_manager().paddle_recognize(enhanced_img)
+        return _select_ocr_candidates(((text, score, None) for text, score in pairs), start_time)
         
     except Exception as e:
-        processing_time = time.time() - start_time
+        processing_time = (time.perf_counter_ns() - start_time) / 1e9
         logger.error(f"PaddleOCR Error: {e}")
-        return {
-            'text': '',
-            'confidence': 0.0,
-            'processing_time': processing_time,
-            'all_results': []
-        }
+        return _empty_ocr_result(processing_time)
+
+def paddleocr_plates_batch(imgs, enhanced=False):
+    """Birden fazla plaka crop'unu tek bir PaddleOCR tanıma çağrısında oku"""
+    start_time = time.perf_counter_ns()
+    try:
+        enhanced_imgs = imgs if enhanced else [enhance_plate_image(img) for img in imgs]
+        pairs_list = get_ocr_manager().paddle_recognize_batch(enhanced_imgs)
+        return [
+            _select_ocr_candidates(((text, score, None) for text, score in pairs), start_time)
+            for pairs in pairs_list
+        ]
+
+    except Exception as e:
+        processing_time = (time.perf_counter_ns() - start_time) / 1e9
+        logger.error(f"PaddleOCR batch Error: {e}")
+        return [_empty_ocr_result(processing_time) for _ in imgs]
 
 def clean_plate_text(text):
     """Gelişmiş metin temizleme - Enhanced logic + formatting kullanıyor"""
@@ -256,66 +388,144 @@ def validate_turkish_plate(text):
     """Gelişmiş format kontrolü - Enhanced logic kullanıyor"""
     return enhanced_validation(text)
 
+def _easyocr_is_confident(easyocr_result):
+    """EasyOCR sonucu tek başına yeterliyse (yüksek güven + geçerli plaka formatı) True"""
+    return (
+        easyocr_result['confidence'] >= OCR_EARLY_EXIT_CONF
+        and enhanced_validation(enhanced_clean_text(easyocr_result['text']))
+    )
+
+def _build_ocr_result(easyocr_result, paddleocr_result, total_start_time):
+    """İki motorun ham sonuçlarından ensemble kararını ve API sonuç sözlüğünü oluştur"""
+    # Her metni bir kez temizle; hem ensemble kararı hem görüntülenen alanlar bunu kullanır
+    easy_cleaned = enhanced_clean_text(easyocr_result['text'])
+    paddle_cleaned = enhanced_clean_text(paddleocr_result['text'])
+    
+    # Smart ensemble decision - CORE IMPROVEMENT
+    ensemble_text, ensemble_confidence, decision_reason = smart_ensemble_decision(
+        easy_cleaned, easyocr_result['confidence'],
+        paddle_cleaned, paddleocr_result['confidence']
+    )
+    
+    # Determine ensemble source based on decision
+    if "both_agree" in decision_reason:
+        ensemble_source = "both"
+    elif "easyocr" in decision_reason:
+        ensemble_source = "easyocr"
+    elif "paddleocr" in decision_reason:
+        ensemble_source = "paddleocr"
+    else:
+        ensemble_source = "fallback"
+    
+    # Individual results for display (now with spaces)
+    easyocr_cleaned = format_plate_with_spaces(easy_cleaned)
+    paddleocr_cleaned = format_plate_with_spaces(paddle_cleaned)
+    
+    total_processing_time = (time.perf_counter_ns() - total_start_time) / 1e9
+    
+    # Log the decision for debugging (f-string sadece debug açıkken oluşturulur)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"OCR Decision: {decision_reason}, Easy: '{easyocr_result['text']}' → '{easyocr_cleaned}', "
+                    f"Paddle: '{paddleocr_result['text']}' → '{paddleocr_cleaned}', Final: '{ensemble_text}'")
+    
+    return {
+        "easyocr": easyocr_cleaned,
+        "easyocr_confidence": easyocr_result['confidence'],
+        "easyocr_processing_time": easyocr_result['processing_time'],
+        "paddleocr": paddleocr_cleaned,
+        "paddleocr_confidence": paddleocr_result['confidence'],
+        "paddleocr_processing_time": paddleocr_result['processing_time'],
+        "ensemble": ensemble_text,
+        "ensemble_confidence": ensemble_confidence,
+        "ensemble_source": ensemble_source,
+        "total_processing_time": total_processing_time
+    }
+
+def _failed_ocr_result(total_start_time):
+    return {
+        "easyocr": "",
+        "easyocr_confidence": 0.0,
+        "easyocr_processing_time": 0.0,
+        "paddleocr": "",
+        "paddleocr_confidence": 0.0,
+        "paddleocr_processing_time": 0.0,
+        "ensemble": "",
+        "ensemble_confidence": 0.0,
+        "ensemble_source": "none",
+        "total_processing_time": (time.perf_counter_ns() - total_start_time) / 1e9
+    }
+
 def get_all_ocr_results(img):
     """Tüm OCR sonuçlarını detaylı döndür - Smart position-aware ensemble logic ile"""
-    total_start_time = time.time()
+    total_start_time = time.perf_counter_ns()
     
     try:
-        # Her OCR motorundan detaylı sonuç al
-        easyocr_result = easyocr_plate(img)
-        paddleocr_result = paddleocr_plate(img)
-        
-        # Smart ensemble decision - CORE IMPROVEMENT
-        ensemble_text, ensemble_confidence, decision_reason = smart_ensemble_decision(
-            easyocr_result['text'], easyocr_result['confidence'],
-            paddleocr_result['text'], paddleocr_result['confidence']
-        )
-        
-        # Determine ensemble source based on decision
-        if "both_agree" in decision_reason:
-            ensemble_source = "both"
-        elif "easyocr" in decision_reason:
-            ensemble_source = "easyocr"
-        elif "paddleocr" in decision_reason:
-            ensemble_source = "paddleocr"
+        # Aynı crop daha önce okunduysa OCR motorlarını atla
+        cache_key = ocr_result_cache.make_key(img)
+        cached = ocr_result_cache.get(cache_key)
+        if cached is not None:
+            cached["total_processing_time"] = (time.perf_counter_ns() - total_start_time) / 1e9
+            return cached
+
+        # Görüntüyü bir kez iyileştir; önce EasyOCR, yeterince emin değilse PaddleOCR
+        enhanced_img = enhance_plate_image(img)
+        easyocr_result = easyocr_plate(enhanced_img, enhanced=True)
+        if _easyocr_is_confident(easyocr_result):
+            paddleocr_result = _empty_ocr_result(0.0)
         else:
-            ensemble_source = "fallback"
+            paddleocr_result = paddleocr_plate(enhanced_img, enhanced=True)
         
-        # Clean individual results for display (now with spaces)
-        easyocr_cleaned = clean_plate_text(easyocr_result['text'])
-        paddleocr_cleaned = clean_plate_text(paddleocr_result['text'])
+        result = _build_ocr_result(easyocr_result, paddleocr_result, total_start_time)
+        ocr_result_cache.put(cache_key, result)
+        return result
         
-        total_processing_time = time.time() - total_start_time
+    except Exception as e:
+        logger.error(f"Error in get_all_ocr_results: {e}")
+        return _failed_ocr_result(total_start_time)
+
+def get_all_ocr_results_batch(imgs, cache_keys=None, enhance=True):
+    """
+    Bir görseldeki tüm plaka crop'larını birlikte oku.
+    EasyOCR tek bir batch çağrısı ile çalışır; PaddleOCR sadece EasyOCR'ın emin
+    olmadığı crop'lar için, yine tek bir tanıma çağrısında çalışır.
+    Cache'te olan crop'lar motorlara hiç gönderilmez. cache_keys verilirse
+    (ör. ham crop'tan üretilmiş anahtarlar) crop'lar yeniden hash'lenmez.
+    enhance=False ise crop'lar enhance_plate_image'dan geçirilmeden (ör. renkli) motorlara verilir.
+    """
+    total_start_time = time.perf_counter_ns()
+    results = [None] * len(imgs)
+    
+    try:
+        # Cache'te olmayan crop'ları ayıkla
+        if cache_keys is None:
+            cache_keys = [ocr_result_cache.make_key(img) for img in imgs]
+        pending = []
+        for i, key in enumerate(cache_keys):
+            cached = ocr_result_cache.get(key)
+            if cached is not None:
+                cached["total_processing_time"] = (time.perf_counter_ns() - total_start_time) / 1e9
+                results[i] = cached
+            else:
+                pending.append(i)
         
-        # Log the decision for debugging
-        logger.debug(f"OCR Decision: {decision_reason}, Easy: '{easyocr_result['text']}' → '{easyocr_cleaned}', "
-                    f"Paddle: '{paddleocr_result['text']}' → '{paddleocr_cleaned}', Final: '{ensemble_text}'")
+        if pending:
+            enhanced_imgs = [enhance_plate_image(imgs[i]) if enhance else imgs[i] for i in pending]
+            easyocr_results = easyocr_plates_batch(enhanced_imgs, enhanced=True)
+            # EasyOCR'ın emin olmadığı crop'lar tek PaddleOCR çağrısında okunur
+            unsure = [j for j, easyocr_result in enumerate(easyocr_results) if not _easyocr_is_confident(easyocr_result)]
+            paddleocr_results = [_empty_ocr_result(0.0) for _ in pending]
+            if unsure:
+                batch_results = paddleocr_plates_batch([enhanced_imgs[j] for j in unsure], enhanced=True)
+                for j, paddleocr_result in zip(unsure, batch_results):
+                    paddleocr_results[j] = paddleocr_result
+            
+            for i, easyocr_result, paddleocr_result in zip(pending, easyocr_results, paddleocr_results):
+                result = _build_ocr_result(easyocr_result, paddleocr_result, total_start_time)
+                ocr_result_cache.put(cache_keys[i], result)
+                results[i] = result
         
-        return {
-            "easyocr": easyocr_cleaned,
-            "easyocr_confidence": easyocr_result['confidence'],
-            "easyocr_processing_time": easyocr_result['processing_time'],
-            "paddleocr": paddleocr_cleaned,
-            "paddleocr_confidence": paddleocr_result['confidence'],
-            "paddleocr_processing_time": paddleocr_result['processing_time'],
-            "ensemble": ensemble_text,
-            "ensemble_confidence": ensemble_confidence,
-            "ensemble_source": ensemble_source,
-            "total_processing_time": total_processing_time
-        }
+        return results
         
     except Exception as e:
-        total_processing_time = time.time() - total_start_time
-        logger.error(f"Error in get_all_ocr_results: {e}")
-        return {
-            "easyocr": "",
-            "easyocr_confidence": 0.0,
-            "easyocr_processing_time": 0.0,
-            "paddleocr": "",
-            "paddleocr_confidence": 0.0,
-            "paddleocr_processing_time": 0.0,
-            "ensemble": "",
-            "ensemble_confidence": 0.0,
-            "ensemble_source": "none",
-            "total_processing_time": total_processing_time
-        }
\ No newline at end of file
+        logger.error(f"Error in get_all_ocr_results_batch: {e}")
+        return [result or _failed_ocr_result(total_start_time) for result in results]
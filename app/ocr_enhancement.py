@@ -3,25 +3,82 @@
 
 import re
 import logging
+import operator
+from collections import namedtuple
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
 # Province codes (01-81) for validation
-VALID_PROVINCE_CODES = {
-    '01', '02', '03', '04', '05', '06', '07', '08', '09', '10',
-    '11', '12', '13', '14', '15', '16', '17', '18', '19', '20',
-    '21', '22', '23', '24', '25', '26', '27', '28', '29', '30',
-    '31', '32', '33', '34', '35', '36', '37', '38', '39', '40',
-    '41', '42', '43', '44', '45', '46', '47', '48', '49', '50',
-    '51', '52', '53', '54', '55', '56', '57', '58', '59', '60',
-    '61', '62', '63', '64', '65', '66', '67', '68', '69', '70',
-    '71', '72', '73', '74', '75', '76', '77', '78', '79', '80', '81'
-}
+VALID_PROVINCE_CODES = frozenset(f"{code:02d}" for code in range(1, 82))
 
 # Position-aware OCR corrections
 LETTER_TO_NUMBER = {'B': '8', 'D': '0', 'G': '6', 'S': '5', 'O': '0', 'I': '1', 'Z': '2'}
 NUMBER_TO_LETTER = {'8': 'B', '0': 'O', '6': 'G', '5': 'S', '1': 'I', '2': 'Z'}
 
+# Tek karakterlik düzeltmeler için str.translate tabloları (tek geçişte uygulanır)
+_LETTER_TO_NUMBER_TBL = str.maketrans(LETTER_TO_NUMBER)
+_NUMBER_TO_LETTER_TBL = str.maketrans(NUMBER_TO_LETTER)
+_PROVINCE_DIGIT_TBL = str.maketrans({'O': '0', 'I': '1', 'D': '0'})
+# Conservative number corrections (avoid G→6 problem)
+_CONSERVATIVE_DIGIT_TBL = str.maketrans({'O': '0', 'I': '1', 'S': '5', 'Z': '2'})
+_SPECIAL_DIGIT_TBL = str.maketrans({'O': '0', 'I': '1', 'S': '5'})
+_CONSERVATIVE_LETTER_TBL = str.maketrans({'0': 'O', '1': 'I'})
+_OBVIOUS_TBL = str.maketrans({'O': '0', 'I': '1'})
+
+# Plaka karakter seti (OCR allowlist ile aynı)
+PLATE_CHARSET = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+class _AllowlistTable(dict):
+    """str.translate tablosu: allowlist dışındaki her karakteri (ASCII olmayanlar dahil) siler"""
+    def __missing__(self, key):
+        return None
+
+_ALLOWLIST_TABLE = _AllowlistTable((ord(c), ord(c)) for c in PLATE_CHARSET)
+
+# Regex'in [A-Z] / [0-9] sınıflarıyla birebir aynı karakter kümeleri
+_PLATE_LETTERS = frozenset("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+_PLATE_DIGITS = frozenset("0123456789")
+
+# Tüm geçerli plaka formatları tek bir regex'te: standart, diplomatik, eski.
+# Alternatifler format_plate_with_spaces'teki deneme sırasıyla aynıdır; hangi formatın
+# eşleştiği dolu olan grup adından anlaşılır
+_PLATE_FORMATS_RE = re.compile(
+    r'^(?:(?P<province>[0-9]{2})(?P<letters>[A-Z]{1,3})(?P<numbers>[0-9]{1,4})'
+    r'|(?P<dip_letters>[A-Z]{2,3})(?P<dip_numbers>[0-9]{3,4})(?P<dip_trailing>[A-Z]?)'
+    r'|(?P<old_letters1>[A-Z]{1,2})(?P<old_numbers>[0-9]{2,4})(?P<old_letters2>[A-Z]{1,2}))$'
+)
+
+# Sıcak yolda kullanılan regex'ler modül yüklenirken bir kez derlenir
+_NON_ALNUM_RE = re.compile(r'[^A-Z0-9]')
+_STANDARD_FORMAT_RE = re.compile(r'^([0-9]{2})([A-Z]{1,3})([0-9]{1,4})$')
+_DIPLOMATIC_FORMAT_RE = re.compile(r'^([A-Z]{2,3})([0-9]{3,4})([A-Z]?)$')
+_OLD_FORMAT_RE = re.compile(r'^([A-Z]{1,2})([0-9]{2,4})([A-Z]{1,2})$')
+
+# All possible Turkish plate patterns after province code (34...)
+# Harf ve rakam grupları ayrık olduğundan bir metne en fazla bir desen uyar;
+# güven, tek regex eşleşmesinden sonra (harf sayısı, rakam sayısı) ile tablodan alınır
+_STANDARD_PATTERN_CONF = {
+    # 1 letter + 1-4 numbers
+    (1, 1): 0.7, (1, 2): 0.8, (1, 3): 0.9, (1, 4): 0.9,
+    # 2 letters + 1-4 numbers
+    (2, 1): 0.8, (2, 2): 0.9, (2, 3): 0.9, (2, 4): 0.8,
+    # 3 letters + 1-4 numbers
+    (3, 1): 0.9, (3, 2): 0.8, (3, 3): 0.7, (3, 4): 0.6,
+}
+
+# Plaka yapı analizi sonucu (dict yerine hafif, değişmez kayıt)
+PlateAnalysis = namedtuple(
+    'PlateAnalysis',
+    'type confidence groups expected_letters expected_numbers corrected_text corrections_made',
+    defaults=((), None, None, None, None)
+)
+_get_confidence = operator.attrgetter('confidence')
+
+# Saf string fonksiyonları için memoization boyutu (aynı plaka ardışık karelerde/isteklerde tekrar eder)
+TEXT_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
 def enhanced_clean_text(text):
     """
     Enhanced text cleaning with smart context-aware OCR error correction
@@ -29,9 +86,8 @@ def enhanced_clean_text(text):
     if not text:
         return ""
     
-    # Basic cleanup
-    text = text.upper().strip()
-    text = re.sub(r"[^A-Z0-9]", "", text)
+    # Basic cleanup (tek geçişte allowlist dışı karakterleri sil)
+    text = text.upper().translate(_ALLOWLIST_TABLE)
     
     # Apply context-aware corrections
     text = context_aware_correction(text)
@@ -49,29 +105,26 @@ def format_plate_with_spaces(text):
     if not text or len(text) < 5:
         return text
     
+    match = _PLATE_FORMATS_RE.match(text)
+    if not match:
+        # If no pattern matches, return as is
+        return text
+    
     # Standard Turkish format: 34ABC123 → 34 ABC 123
-    standard_match = re.match(r'^([0-9]{2})([A-Z]{1,3})([0-9]{1,4})$', text)
-    if standard_match:
-        province, letters, numbers = standard_match.groups()
-        return f"{province} {letters} {numbers}"
+    if match.group('province') is not None:
+        return f"{match.group('province')} {match.group('letters')} {match.group('numbers')}"
     
     # Diplomatic format: ABC1234 → ABC 1234 (no change needed for short ones)
-    diplomatic_match = re.match(r'^([A-Z]{2,3})([0-9]{3,4})([A-Z]?)$', text)
-    if diplomatic_match:
-        letters, numbers, trailing = diplomatic_match.groups()
+    if match.group('dip_letters') is not None:
+        letters, numbers, trailing = match.group('dip_letters', 'dip_numbers', 'dip_trailing')
         if trailing:
             return f"{letters} {numbers} {trailing}"
         else:
             return f"{letters} {numbers}"
     
     # Old format: A1234BC → A 1234 BC
-    old_match = re.match(r'^([A-Z]{1,2})([0-9]{2,4})([A-Z]{1,2})$', text)
-    if old_match:
-        letters1, numbers, letters2 = old_match.groups()
-        return f"{letters1} {numbers} {letters2}"
-    
-    # If no pattern matches, return as is
-    return text
+    letters1, numbers, letters2 = match.group('old_letters1', 'old_numbers', 'old_letters2')
+    return f"{letters1} {numbers} {letters2}"
 
 def enhanced_validation(text):
     """
@@ -80,45 +133,17 @@ def enhanced_validation(text):
     if not text or len(text) < 5:
         return False
     
-    # Standard Turkish format: 34[1-3 letters][1-4 numbers]
-    # All valid combinations:
-    valid_patterns = [
-        # 1 letter + 1-4 numbers
-        r'^[0-9]{2}[A-Z]{1}[0-9]{1}$',   # 34A1
-        r'^[0-9]{2}[A-Z]{1}[0-9]{2}$',   # 34A12
-        r'^[0-9]{2}[A-Z]{1}[0-9]{3}$',   # 34A123
-        r'^[0-9]{2}[A-Z]{1}[0-9]{4}$',   # 34A1234
-        
-        # 2 letters + 1-4 numbers
-        r'^[0-9]{2}[A-Z]{2}[0-9]{1}$',   # 34AB1
-        r'^[0-9]{2}[A-Z]{2}[0-9]{2}$',   # 34AB12
-        r'^[0-9]{2}[A-Z]{2}[0-9]{3}$',   # 34AB123
-        r'^[0-9]{2}[A-Z]{2}[0-9]{4}$',   # 34AB1234
-        
-        # 3 letters + 1-4 numbers
-        r'^[0-9]{2}[A-Z]{3}[0-9]{1}$',   # 34ABC1
-        r'^[0-9]{2}[A-Z]{3}[0-9]{2}$',   # 34ABC12
-        r'^[0-9]{2}[A-Z]{3}[0-9]{3}$',   # 34ABC123
-        r'^[0-9]{2}[A-Z]{3}[0-9]{4}$',   # 34ABC1234
-    ]
-    
-    for pattern in valid_patterns:
-        if re.match(pattern, text):
-            # Check if province code is valid
-            province = text[:2]
-            if province in VALID_PROVINCE_CODES:
-                return True
-    
+    # Standard Turkish format: 34[1-3 letters][1-4 numbers] (province code must be valid)
     # Diplomatic format: ABC1234 or ABC1234D
-    if re.match(r'^[A-Z]{2,3}[0-9]{3,4}[A-Z]?$', text):
-        return True
-    
     # Old format: A1234BC
-    if re.match(r'^[A-Z]{1,2}[0-9]{2,4}[A-Z]{1,2}$', text):
-        return True
-    
-    return False
+    match = _PLATE_FORMATS_RE.match(text)
+    if not match:
+        return False
 
+    province = match.group('province')
+    return province is None or province in VALID_PROVINCE_CODES
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
 def context_aware_correction(text):
     """
     Context-aware correction that analyzes the entire plate to make better decisions
@@ -127,12 +152,18 @@ def context_aware_correction(text):
         return text
     
     # Remove any spaces or special characters
-    clean_text = re.sub(r'[^A-Z0-9]', '', text.upper())
+    clean_text = _NON_ALNUM_RE.sub('', text.upper())
+    
+    # Zaten geçerli il koduna sahip standart formattaysa düzeltme gerekmez;
+    # varyant üretimi ve desen analizi atlanır
+    standard_match = _STANDARD_FORMAT_RE.match(clean_text)
+    if standard_match and standard_match.group(1) in VALID_PROVINCE_CODES:
+        return clean_text
     
     # Analyze the pattern to determine the most likely structure
     analysis = analyze_plate_pattern(clean_text)
     
-    if analysis['confidence'] > 0.6:
+    if analysis.confidence > 0.6:
         return apply_corrections_based_on_analysis(clean_text, analysis)
     else:
         # Fallback to conservative correction
@@ -145,94 +176,74 @@ def analyze_plate_pattern(text):
     """
     results = []
     
-    # All possible Turkish plate patterns after province code (34...)
-    standard_patterns = [
-        # 1 letter + 1-4 numbers
-        {'regex': r'^([0-9]{2})([A-Z]{1})([0-9]{1})$', 'letters': 1, 'numbers': 1, 'confidence': 0.7},
-        {'regex': r'^([0-9]{2})([A-Z]{1})([0-9]{2})$', 'letters': 1, 'numbers': 2, 'confidence': 0.8},
-        {'regex': r'^([0-9]{2})([A-Z]{1})([0-9]{3})$', 'letters': 1, 'numbers': 3, 'confidence': 0.9},
-        {'regex': r'^([0-9]{2})([A-Z]{1})([0-9]{4})$', 'letters': 1, 'numbers': 4, 'confidence': 0.9},
+    # Test the combined standard pattern against original text
+    match = _STANDARD_FORMAT_RE.match(text)
+    if match:
+        groups = match.groups()
+        province, letters, numbers = groups
+        n_letters, n_numbers = len(letters), len(numbers)
+        
+        score = 0.5
         
-        # 2 letters + 1-4 numbers  
-        {'regex': r'^([0-9]{2})([A-Z]{2})([0-9]{1})$', 'letters': 2, 'numbers': 1, 'confidence': 0.8},
-        {'regex': r'^([0-9]{2})([A-Z]{2})([0-9]{2})$', 'letters': 2, 'numbers': 2, 'confidence': 0.9},
-        {'regex': r'^([0-9]{2})([A-Z]{2})([0-9]{3})$', 'letters': 2, 'numbers': 3, 'confidence': 0.9},
-        {'regex': r'^([0-9]{2})([A-Z]{2})([0-9]{4})$', 'letters': 2, 'numbers': 4, 'confidence': 0.8},
+        # Province validation
+        if province in VALID_PROVINCE_CODES:
+            score += 0.3
         
-        # 3 letters + 1-4 numbers
-        {'regex': r'^([0-9]{2})([A-Z]{3})([0-9]{1})$', 'letters': 3, 'numbers': 1, 'confidence': 0.9},
-        {'regex': r'^([0-9]{2})([A-Z]{3})([0-9]{2})$', 'letters': 3, 'numbers': 2, 'confidence': 0.8},
-        {'regex': r'^([0-9]{2})([A-Z]{3})([0-9]{3})$', 'letters': 3, 'numbers': 3, 'confidence': 0.7},
-        {'regex': r'^([0-9]{2})([A-Z]{3})([0-9]{4})$', 'letters': 3, 'numbers': 4, 'confidence': 0.6},
-    ]
-    
-    # Test each pattern against original text
-    for pattern in standard_patterns:
-        match = re.match(pattern['regex'], text)
-        if match:
-            groups = match.groups()
+        # Pattern likelihood scoring
+        if n_letters == 2 and 2 <= n_numbers <= 3:
+            score += 0.2  # Most common: 34AB123, 34AB12
+        elif n_letters == 3 and n_numbers == 1:
+            score += 0.15  # Common: 34ABC1
+        elif n_letters == 1 and n_numbers == 4:
+            score += 0.15  # Common: 34A1234
+        
+        results.append(PlateAnalysis(
+            type='standard',
+            confidence=score * _STANDARD_PATTERN_CONF[(n_letters, n_numbers)],
+            groups=groups,
+            expected_letters=n_letters,
+            expected_numbers=n_numbers
+        ))
+    
+    # Test with intelligent corrections applied
+    corrected_variants = generate_correction_variants(text)
+    for variant in corrected_variants:
+        groups = variant.get('groups')
+        if groups is None:
+            match = _STANDARD_FORMAT_RE.match(variant['text'])
+            groups = match.groups() if match else None
+        if groups:
             province, letters, numbers = groups
+            n_letters, n_numbers = len(letters), len(numbers)
             
-            score = 0.5
+            score = 0.4  # Base score for corrected text
             
-            # Province validation
             if province in VALID_PROVINCE_CODES:
                 score += 0.3
             
-            # Pattern likelihood scoring
-            if pattern['letters'] == 2 and 2 <= pattern['numbers'] <= 3:
-                score += 0.2  # Most common: 34AB123, 34AB12
-            elif pattern['letters'] == 3 and pattern['numbers'] == 1:
-                score += 0.15  # Common: 34ABC1
-            elif pattern['letters'] == 1 and pattern['numbers'] == 4:
-                score += 0.15  # Common: 34A1234
+            score += variant['correction_score']
             
-            results.append({
-                'type': 'standard',
-                'groups': groups,
-                'confidence': score * pattern['confidence'],
-                'pattern': pattern,
-                'expected_letters': pattern['letters'],
-                'expected_numbers': pattern['numbers']
-            })
-    
-    # Test with intelligent corrections applied
-    corrected_variants = generate_correction_variants(text)
-    for variant in corrected_variants:
-        for pattern in standard_patterns:
-            match = re.match(pattern['regex'], variant['text'])
-            if match:
-                groups = match.groups()
-                province, letters, numbers = groups
-                
-                score = 0.4  # Base score for corrected text
-                
-                if province in VALID_PROVINCE_CODES:
-                    score += 0.3
-                
-                score += variant['correction_score']
-                
-                results.append({
-                    'type': 'standard',
-                    'groups': groups,
-                    'confidence': score * pattern['confidence'] * 0.9,
-                    'pattern': pattern,
-                    'expected_letters': pattern['letters'],
-                    'expected_numbers': pattern['numbers'],
-                    'corrected_text': variant['text'],
-                    'corrections_made': variant['corrections']
-                })
+            results.append(PlateAnalysis(
+                type='standard',
+                confidence=score * _STANDARD_PATTERN_CONF[(n_letters, n_numbers)] * 0.9,
+                groups=groups,
+                expected_letters=n_letters,
+                expected_numbers=n_numbers,
+                corrected_text=variant['text'],
+                corrections_made=variant['corrections']
+            ))
     
     # Add special formats
     results.extend(analyze_special_formats(text))
     
     # Return best analysis
     if results:
-        best = max(results, key=lambda x: x['confidence'])
-        logger.debug(f"Pattern analysis: {best.get('expected_letters', '?')}L+{best.get('expected_numbers', '?')}N, confidence={best['confidence']:.2f}")
+        best = max(results, key=_get_confidence)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Pattern analysis: {best.expected_letters or '?'}L+{best.expected_numbers or '?'}N, confidence={best.confidence:.2f}")
         return best
     
-    return {'confidence': 0.0, 'type': 'unknown'}
+    return PlateAnalysis(type='unknown', confidence=0.0)
 
 def generate_correction_variants(text):
     """
@@ -244,9 +255,7 @@ def generate_correction_variants(text):
         return variants
     
     # Strategy 1: Conservative province correction only
-    province_corrected = text[:2]
-    for letter, number in {'O': '0', 'I': '1', 'D': '0'}.items():
-        province_corrected = province_corrected.replace(letter, number)
+    province_corrected = text[:2].translate(_PROVINCE_DIGIT_TBL)
     
     if province_corrected != text[:2]:
         variants.append({
@@ -256,35 +265,38 @@ def generate_correction_variants(text):
         })
     
     # Strategy 2: Try different letter/number boundary assumptions
+    # Yalnızca standart formata (il kodu + 1-3 harf + 1-4 rakam) uyabilecek varyantlar
+    # analyze_plate_pattern'de kullanılır; il kodu rakama dönmüyorsa hiçbiri uymaz
+    if not _PLATE_DIGITS.issuperset(province_corrected):
+        return variants
+    
     remaining = text[2:]  # After province
     
-    # Test all possible split points
-    for split_point in range(1, len(remaining)):
-        potential_letters = remaining[:split_point]
-        potential_numbers = remaining[split_point:]
+    # Apply corrections based on assumed positions (kuyruğa bir kez uygulanır, split'lerde dilimlenir)
+    letters_corrected = remaining.translate(_NUMBER_TO_LETTER_TBL)
+    # Conservative number corrections (avoid G→6 problem)
+    numbers_corrected = remaining.translate(_CONSERVATIVE_DIGIT_TBL)
+    
+    # Only split points with 1-3 letters and 1-4 numbers
+    for split_point in range(max(1, len(remaining) - 4), min(3, len(remaining) - 1) + 1):
+        corrected_letters = letters_corrected[:split_point]
+        corrected_numbers = numbers_corrected[split_point:]
         
-        # Don't test if lengths are outside valid ranges
-        if not (1 <= len(potential_letters) <= 3 and 1 <= len(potential_numbers) <= 4):
+        # Düzeltme sonrası harf bölümü harf, rakam bölümü rakam değilse desen uymaz
+        if not (_PLATE_LETTERS.issuperset(corrected_letters) and _PLATE_DIGITS.issuperset(corrected_numbers)):
             continue
         
-        # Apply corrections based on assumed positions
-        corrected_letters = potential_letters
-        for number, letter in NUMBER_TO_LETTER.items():
-            corrected_letters = corrected_letters.replace(number, letter)
-        
-        corrected_numbers = potential_numbers
-        # Conservative number corrections (avoid G→6 problem)
-        conservative_fixes = {'O': '0', 'I': '1', 'S': '5', 'Z': '2'}
-        for letter, number in conservative_fixes.items():
-            corrected_numbers = corrected_numbers.replace(letter, number)
-        
         corrected_variant = province_corrected + corrected_letters + corrected_numbers
         
         if corrected_variant != text:
+            potential_letters = remaining[:split_point]
+            potential_numbers = remaining[split_point:]
             score = calculate_variant_score(potential_letters, potential_numbers, corrected_letters, corrected_numbers)
             
             variants.append({
                 'text': corrected_variant,
+                # Bu varyant standart formata uyduğu kesin; gruplar regex'siz taşınır
+                'groups': (province_corrected, corrected_letters, corrected_numbers),
                 'correction_score': score,
                 'corrections': [
                     f"Letters: {potential_letters} → {corrected_letters}",
@@ -309,10 +321,8 @@ def calculate_variant_score(orig_letters, orig_numbers, corr_letters, corr_numbe
         score += 0.15
     
     # Penalty for too many corrections
-    letter_changes = sum(1 for i, c in enumerate(orig_letters) if i < len(corr_letters) and c != corr_letters[i])
-    number_changes = sum(1 for i, c in enumerate(orig_numbers) if i < len(corr_numbers) and c != corr_numbers[i])
-    
-    total_changes = letter_changes + number_changes
+    # map kısa olan string'de durur; indeks/sınır kontrolü gerekmez
+    total_changes = sum(map(operator.ne, orig_letters, corr_letters)) + sum(map(operator.ne, orig_numbers, corr_numbers))
     if total_changes <= 2:
         score += 0.1
     elif total_changes <= 4:
@@ -329,34 +339,14 @@ def analyze_special_formats(text):
     results = []
     
     # Diplomatic format: ABC1234 or ABC1234D
-    diplomatic_patterns = [
-        {'regex': r'^([A-Z]{2,3})([0-9]{3,4})([A-Z]?)$', 'type': 'diplomatic', 'confidence': 0.8}
-    ]
-    
-    for pattern in diplomatic_patterns:
-        match = re.match(pattern['regex'], text)
-        if match:
-            results.append({
-                'type': 'diplomatic',
-                'groups': match.groups(),
-                'confidence': pattern['confidence'],
-                'pattern': pattern
-            })
+    match = _DIPLOMATIC_FORMAT_RE.match(text)
+    if match:
+        results.append(PlateAnalysis(type='diplomatic', confidence=0.8, groups=match.groups()))
     
     # Old format: A1234BC
-    old_patterns = [
-        {'regex': r'^([A-Z]{1,2})([0-9]{2,4})([A-Z]{1,2})$', 'type': 'old', 'confidence': 0.6}
-    ]
-    
-    for pattern in old_patterns:
-        match = re.match(pattern['regex'], text)
-        if match:
-            results.append({
-                'type': 'old',
-                'groups': match.groups(),
-                'confidence': pattern['confidence'],
-                'pattern': pattern
-            })
+    match = _OLD_FORMAT_RE.match(text)
+    if match:
+        results.append(PlateAnalysis(type='old', confidence=0.6, groups=match.groups()))
     
     return results
 
@@ -364,11 +354,11 @@ def apply_corrections_based_on_analysis(text, analysis):
     """
     Apply corrections based on the structural analysis with full pattern support
     """
-    if analysis['type'] == 'standard':
+    if analysis.type == 'standard':
         return apply_dynamic_standard_corrections(text, analysis)
-    elif analysis['type'] == 'diplomatic':
+    elif analysis.type == 'diplomatic':
         return apply_diplomatic_corrections(text, analysis)
-    elif analysis['type'] == 'old':
+    elif analysis.type == 'old':
         return apply_old_format_corrections(text, analysis)
     else:
         return text
@@ -377,25 +367,23 @@ def apply_dynamic_standard_corrections(text, analysis):
     """
     Apply corrections for standard format with dynamic letter/number boundaries
     """
-    if 'corrected_text' in analysis:
-        result = analysis['corrected_text']
-        logger.debug(f"Dynamic correction ({analysis['expected_letters']}L+{analysis['expected_numbers']}N): {text} → {result}")
+    if analysis.corrected_text is not None:
+        result = analysis.corrected_text
+        logger.debug(f"Dynamic correction ({analysis.expected_letters}L+{analysis.expected_numbers}N): {text} → {result}")
         return result
     
     # If no pre-corrected text, apply basic corrections
-    groups = analysis['groups']
+    groups = analysis.groups
     if len(groups) >= 3:
         province, letters, numbers = groups[:3]
         
         # Fix province
-        fixed_province = province
-        for letter, number in LETTER_TO_NUMBER.items():
-            fixed_province = fixed_province.replace(letter, number)
+        fixed_province = province.translate(_LETTER_TO_NUMBER_TBL)
         
         result = fixed_province + letters + numbers
         
         if result != text:
-            logger.debug(f"Basic correction ({analysis['expected_letters']}L+{analysis['expected_numbers']}N): {text} → {result}")
+            logger.debug(f"Basic correction ({analysis.expected_letters}L+{analysis.expected_numbers}N): {text} → {result}")
         
         return result
     
@@ -405,18 +393,13 @@ def apply_diplomatic_corrections(text, analysis):
     """
     Apply corrections for diplomatic format plates
     """
-    groups = analysis['groups']
+    groups = analysis.groups
     if len(groups) >= 2:
         letters, numbers = groups[:2]
         
         # Conservative corrections for diplomatic plates
-        fixed_letters = letters
-        for number, letter in {'0': 'O', '1': 'I'}.items():
-            fixed_letters = fixed_letters.replace(number, letter)
-        
-        fixed_numbers = numbers
-        for letter, number in {'O': '0', 'I': '1', 'S': '5'}.items():
-            fixed_numbers = fixed_numbers.replace(letter, number)
+        fixed_letters = letters.translate(_CONSERVATIVE_LETTER_TBL)
+        fixed_numbers = numbers.translate(_SPECIAL_DIGIT_TBL)
         
         result = fixed_letters + fixed_numbers
         if len(groups) > 2 and groups[2]:  # Trailing letter
@@ -430,22 +413,14 @@ def apply_old_format_corrections(text, analysis):
     """
     Apply corrections for old format plates: A1234BC
     """
-    groups = analysis['groups']
+    groups = analysis.groups
     if len(groups) >= 3:
         letters1, numbers, letters2 = groups
         
         # Conservative corrections
-        fixed_letters1 = letters1
-        for number, letter in {'0': 'O', '1': 'I'}.items():
-            fixed_letters1 = fixed_letters1.replace(number, letter)
-        
-        fixed_numbers = numbers
-        for letter, number in {'O': '0', 'I': '1', 'S': '5'}.items():
-            fixed_numbers = fixed_numbers.replace(letter, number)
-        
-        fixed_letters2 = letters2
-        for number, letter in {'0': 'O', '1': 'I'}.items():
-            fixed_letters2 = fixed_letters2.replace(number, letter)
+        fixed_letters1 = letters1.translate(_CONSERVATIVE_LETTER_TBL)
+        fixed_numbers = numbers.translate(_SPECIAL_DIGIT_TBL)
+        fixed_letters2 = letters2.translate(_CONSERVATIVE_LETTER_TBL)
         
         return fixed_letters1 + fixed_numbers + fixed_letters2
     
@@ -455,15 +430,8 @@ def apply_conservative_corrections(text):
     """
     Apply very conservative corrections as fallback
     """
-    corrected = text
-    
     # Only fix very obvious confusions
-    obvious_fixes = {'O': '0', 'I': '1'}
-    
-    for old, new in obvious_fixes.items():
-        corrected = corrected.replace(old, new)
-    
-    return corrected
+    return text.translate(_OBVIOUS_TBL)
 
 def calculate_confidence_boost(text, original_confidence):
     """
@@ -471,24 +439,20 @@ def calculate_confidence_boost(text, original_confidence):
     """
     if enhanced_validation(text):
         # Check if it's a perfect Turkish standard format
-        if re.match(r'^[0-9]{2}[A-Z]{1,3}[0-9]{1,4}$', text):
-            province = text[:2]
-            if province in VALID_PROVINCE_CODES:
-                return min(1.0, original_confidence * 1.3)  # 30% boost for perfect format
+        standard_match = _STANDARD_FORMAT_RE.match(text)
+        if standard_match and standard_match.group(1) in VALID_PROVINCE_CODES:
+            return min(1.0, original_confidence * 1.3)  # 30% boost for perfect format
         
         return min(1.0, original_confidence * 1.15)  # 15% boost for valid format
     
     return max(0.1, original_confidence * 0.9)  # Slight penalty for invalid format
 
-def smart_ensemble_decision(easyocr_text, easyocr_conf, paddleocr_text, paddleocr_conf):
+def smart_ensemble_decision(easy_cleaned, easyocr_conf, paddle_cleaned, paddleocr_conf):
     """
     Smart ensemble decision with position-aware validation for all combinations
+    Inputs must already be cleaned with enhanced_clean_text
     Returns formatted result with spaces
     """
-    # Clean both texts
-    easy_cleaned = enhanced_clean_text(easyocr_text)
-    paddle_cleaned = enhanced_clean_text(paddleocr_text)
-    
     # Validate both
     easy_valid = enhanced_validation(easy_cleaned)
     paddle_valid = enhanced_validation(paddle_cleaned)
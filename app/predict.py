@@ -1,27 +1,39 @@
 # app/predict.py
 # This version keeps your original database model and just adds S3 upload
 
+import asyncio
 import numpy as np
 import time
 from fastapi import APIRouter, File, UploadFile, Depends, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 import os
 import uuid
 import logging
+from operator import itemgetter
 
-from .model import model_manager
-from .preprocess import preprocess_plate_crop
-from .ocr import get_all_ocr_results
-from .utils import preprocess_image, validate_image
-from .config import DETECTION_MIN_CONFIDENCE, UPLOAD_DIR
+from .model import model_manager, yolo_batcher
+from .preprocess import preprocess_plate_crop, preprocess_plate_crop_fast
+from .ocr import get_all_ocr_results_batch, ocr_result_cache
+from .utils import load_image_bgr, validate_image
+from .config import (
+    DETECTION_MIN_CONFIDENCE, UPLOAD_DIR, MAX_FILE_SIZE, UPLOAD_CHUNK_SIZE, OCR_CONCURRENCY,
+    USE_FAST_PREPROCESS
+)
 from .database import SessionLocal
 from .models import PlateRecord
-from .exceptions import APIException
+from .exceptions import APIException, FileSizeError
 from .s3_utils import s3_manager
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+_by_detection_confidence = itemgetter("detection_confidence")
+_preprocess_crop = preprocess_plate_crop_fast if USE_FAST_PREPROCESS else preprocess_plate_crop
+# OCR aşamasına aynı anda giren istek sayısını sınırla
+_ocr_semaphore = asyncio.Semaphore(OCR_CONCURRENCY)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -39,127 +51,249 @@ def get_relative_path(filename: str) -> str:
     """Get relative path for database storage (cloud-friendly)"""
     return f"static/uploads/{filename}"
 
+def write_file(path: str, contents: bytes):
+    with open(path, "wb") as f:
+        f.write(contents)
+
+async def upload_to_s3(write_task: asyncio.Task, local_image_path: str, filename: str, content_type: str):
+    """
+    Görsel diske yazılınca S3'e thread'de stream et; (s3_key, s3_url) döndür,
+    başarısızsa None (local URL'e düşülür). İptal edilirse thread'deki upload durdurulamadığı için
+    bitmesi beklenir ve yüklenen nesne silinir.
+    """
+    try:
+        # İptal, handler'ın ayrıca beklediği disk yazım görevine yayılmasın
+        await asyncio.shield(write_task)
+        upload = asyncio.ensure_future(
+            asyncio.to_thread(s3_manager.upload_image_file, local_image_path, filename, content_type)
+        )
+        try:
+            s3_key, s3_url = await asyncio.shield(upload)
+        except asyncio.CancelledError:
+            try:
+                s3_key, _ = await upload
+                await asyncio.to_thread(s3_manager.delete_image, s3_key)
+            except Exception as cleanup_error:
+                logger.warning(f"S3 upload cleanup after cancellation failed: {cleanup_error}")
+            raise
+        logger.info(f"Successfully uploaded to S3: {s3_key}")
+        return s3_key, s3_url
+    except Exception as s3_error:
+        logger.warning(f"S3 upload failed, using local storage: {s3_error}")
+        return None
+
+def save_records(db: Session, rows: list) -> list:
+    """
+    Tüm plaka kayıtlarını tek INSERT ... RETURNING ve tek commit ile yaz.
+    Üretilen (id, detected_at) değerleri satırlarla aynı sırada döner; kayıt başına refresh yapılmaz.
+    """
+    stmt = insert(PlateRecord).returning(
+        PlateRecord.id, PlateRecord.detected_at, sort_by_parameter_order=True
+    )
+    saved = db.execute(stmt, rows).all()
+    db.commit()
+    return saved
+
+def prepare_plate_crops(image_bgr: np.ndarray, result):
+    """
+    YOLO sonucundaki plaka kutularını filtreler, crop'ları cache'e bakarak hazırlar.
+    Hash ve ön işleme CPU işi olduğundan handler bunu thread'de çalıştırır.
+    detections ile aynı sırada OCR sonuçlarını (cache'ten gelenler dolu, diğerleri None)
+    ve OCR'a gidecek crop'ları (slot, crop, cache anahtarı) döndürür.
+    """
+    detections = []
+    all_ocr_results = []
+    ocr_slots, ocr_crops, ocr_keys = [], [], []
+
+    boxes = result.boxes
+    if boxes is None or not len(boxes):
+        return detections, all_ocr_results, ocr_slots, ocr_crops, ocr_keys
+
+    # Tüm kutu verisi (xyxy, conf, cls) tek bir cihaz->CPU kopyasıyla alınır;
+    # kutu başına .item()/.tolist() senkronizasyonu yapılmaz
+    data = boxes.data.cpu().numpy()
+    coords = data[:, :4].astype(np.int64)
+    confidences = data[:, -2]
+    class_ids = data[:, -1].astype(np.int64)
+    # Sınıf ve güven filtresi tüm kutular için tek seferde
+    keep = np.flatnonzero(
+        np.isin(class_ids, model_manager.plate_class_ids)
+        & (confidences >= DETECTION_MIN_CONFIDENCE)
+    )
+
+    for i in keep.tolist():
+        try:
+            x1, y1, x2, y2 = coords[i].tolist()
+            confidence = float(confidences[i])
+
+            crop = image_bgr[y1:y2, x1:x2]
+            if crop.size == 0:
+                continue
+            # Tek kopya: hem hash hem OpenCV ön işleme aynı contiguous buffer'ı kullanır
+            crop = np.ascontiguousarray(crop)
+
+            # Cache anahtarı ham crop'tan üretilir; aynı crop için ön işleme de atlanır
+            cache_key = ocr_result_cache.make_key(crop)
+            cached = ocr_result_cache.get(cache_key)
+            if cached is None:
+                processed = _preprocess_crop(crop)
+                ocr_slots.append(len(detections))
+                ocr_crops.append(processed)
+                ocr_keys.append(cache_key)
+            detections.append((i, [x1, y1, x2, y2], confidence))
+            all_ocr_results.append(cached)
+
+        except Exception as e:
+            logger.warning(f"Error processing plate {i}: {e}")
+            continue
+
+    return detections, all_ocr_results, ocr_slots, ocr_crops, ocr_keys
+
+async def read_upload(file: UploadFile) -> bytes:
+    """Upload'ı parça parça oku; MAX_FILE_SIZE aşılınca dosyanın geri kalanını belleğe almadan reddet"""
+    buffer = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buffer += chunk
+        if len(buffer) > MAX_FILE_SIZE:
+            raise FileSizeError(f"File size exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit")
+    return bytes(buffer)
+
 @router.post("/predict", summary="Görselden plaka tespiti ve gelişmiş OCR")
 async def predict_plate_api(
     request: Request,
     file: UploadFile = File(...),
     db: Session = Depends(get_db)
 ):
-    total_start_time = time.time()
+    total_start_time = time.perf_counter_ns()
     local_image_path = None
+    write_task = None
+    s3_task = None
+
+    # Boyut sınırı aşılırsa 413 olarak dönsün (aşağıdaki genel 500 sarmalayıcısına girmeden)
+    contents = await read_upload(file)
     
     try:
-        # 1. Dosya validasyonu ve kaydı
-        contents = await file.read()
+        # 1. Dosya validasyonu (başlık imzası)
         validate_image(contents, file.filename)
         ext = os.path.splitext(file.filename)[1]
         filename = f"{uuid.uuid4()}{ext}"
+
+        # 2. Görseli tek seferde BGR'ye çöz (event loop'u bloklamadan).
+        # Bozuk piksel verisi burada reddedilir; diske yazım ve S3 upload'ı ancak başarılı çözmeden sonra başlar
+        image_bgr = await asyncio.to_thread(load_image_bgr, contents)
         
-        # 2. Save locally (as before)
+        # 3. Save locally (as before)
         local_image_path = os.path.join(UPLOAD_DIR, filename)
         os.makedirs(UPLOAD_DIR, exist_ok=True)
         
-        with open(local_image_path, "wb") as f:
-            f.write(contents)
+        # Disk yazımı arka planda; tespit ve OCR beklemeden devam eder
+        write_task = asyncio.create_task(asyncio.to_thread(write_file, local_image_path, contents))
 
-        # 3. URL ve path oluşturma
+        # 4. URL ve path oluşturma
         image_url = get_image_url(request, filename)
         relative_path = get_relative_path(filename)
         
-        # 4. AWS S3'e upload et (yeni özellik)
-        s3_url = None
-        try:
-            s3_key, s3_url = s3_manager.upload_image(contents, filename, file.content_type)
-            logger.info(f"Successfully uploaded to S3: {s3_key}")
-            # S3 upload başarılı olursa, S3 URL'i kullan
-            final_image_url = s3_url
-        except Exception as s3_error:
-            logger.warning(f"S3 upload failed, using local storage: {s3_error}")
-            # S3 upload başarısız olursa, local URL kullan
-            final_image_url = image_url
-
-        # 5. Görseli preprocess et (orijinal kod)
-        image_pil, image_np_rgb = preprocess_image(contents)
-        image_bgr = np.ascontiguousarray(image_np_rgb[..., ::-1])
+        # 5. AWS S3'e upload et (yeni özellik) - tespit ve OCR ile eşzamanlı çalışır
+        s3_task = asyncio.create_task(upload_to_s3(write_task, local_image_path, filename, file.content_type))
+        # Ham baytlara handler'da artık gerek yok (disk yazımı kendi referansını tutar, S3 diskteki dosyadan okur)
+        del contents
 
         # 6. Model ile plaka tespiti (orijinal kod)
-        model = model_manager.get_model()
-        results = model(image_bgr)
+        result = await yolo_batcher.submit(image_bgr)
 
         plates = []
+        pending = []
+
+        # 7. Plaka kutularını filtrele ve crop'ları hazırla (hash + ön işleme event loop dışında)
+        detections, all_ocr_results, ocr_slots, ocr_crops, ocr_keys = await asyncio.to_thread(
+            prepare_plate_crops, image_bgr, result
+        )
+
+        # 8. Cache'te olmayan crop'ları tek seferde OCR'a gönder (EasyOCR batch)
+        if ocr_crops:
+            async with _ocr_semaphore:
+                # Hızlı yolda crop'lar renkli kalır; OCR tarafındaki gri/CLAHE/keskinleştirme de atlanır
+                batch_results = await asyncio.to_thread(
+                    get_all_ocr_results_batch, ocr_crops, ocr_keys, not USE_FAST_PREPROCESS
+                )
+            for slot, ocr_results in zip(ocr_slots, batch_results):
+                all_ocr_results[slot] = ocr_results
+
+        # S3 upload başarılı olursa S3 URL'i, başarısız olursa local URL'i kullan
+        s3_upload = await s3_task
+        final_image_url = s3_upload[1] if s3_upload else image_url
+        # Disk yazımı başarısız olduysa burada hata olarak yükselir
+        await write_task
 
-        if results[0].boxes is not None:
-            for i, box in enumerate(results[0].boxes):
-                try:
-                    x1, y1, x2, y2 = map(int, box.xyxy[0].tolist())
-                    confidence = box.conf.item()
-                    class_id = int(box.cls.item())
-
-                    if 0 <= class_id < len(model.names):
-                        class_name = model.names[class_id]
-                        if class_name != 'plate':
-                            continue
-                        if confidence < DETECTION_MIN_CONFIDENCE:
-                            continue
-
-                        crop = image_bgr[y1:y2, x1:x2]
-                        if crop.size == 0:
-                            continue
-
-                        processed = preprocess_plate_crop(crop)
-                        ocr_results = get_all_ocr_results(processed)
-
-                        paddleocr_text = ocr_results['paddleocr']
-                        cleaned_text = ocr_results['ensemble']
-
-                        # Veritabanına kaydet - S3 URL'i kullan (eğer varsa)
-                        record = PlateRecord(
-                            plate_text=paddleocr_text,
-                            image_path=final_image_url  # S3 URL veya local URL
-                        )
-                        db.add(record)
-                        db.commit()
-                        db.refresh(record)
-
-                        # Response (orijinal format)
-                        plates.append({
-                            "id": record.id,
-                            "text": cleaned_text,
-                            "bbox": [x1, y1, x2, y2],
-                            "detection_confidence": round(confidence, 3),
-                            "confidence": round(ocr_results['ensemble_confidence'], 3),
-                            "ocr_confidence": round(ocr_results['ensemble_confidence'], 3),
-                            "ocr_easyocr": ocr_results['easyocr'],
-                            "ocr_easyocr_confidence": round(ocr_results['easyocr_confidence'], 3),
-                            "ocr_easyocr_time": round(ocr_results['easyocr_processing_time'], 3),
-                            "ocr_paddleocr": ocr_results['paddleocr'],
-                            "ocr_paddleocr_confidence": round(ocr_results['paddleocr_confidence'], 3),
-                            "ocr_paddleocr_time": round(ocr_results['paddleocr_processing_time'], 3),
-                            "ensemble": cleaned_text,
-                            "ensemble_source": ocr_results['ensemble_source'],
-                            "image_url": final_image_url,  # S3 URL (preferred) or local URL
-                            "image_path": relative_path,
-                            "detected_at": str(record.detected_at)
-                        })
-
-                except Exception as e:
-                    logger.warning(f"Error processing plate {i}: {e}")
-                    continue
-
-        plates.sort(key=lambda x: x['detection_confidence'], reverse=True)
-        total_processing_time = time.time() - total_start_time
+        for (i, bbox, confidence), ocr_results in zip(detections, all_ocr_results):
+            try:
+                paddleocr_text = ocr_results['paddleocr']
+                cleaned_text = ocr_results['ensemble']
+                ensemble_confidence = round(ocr_results['ensemble_confidence'], 3)
+
+                # Veritabanına kaydet - S3 URL'i kullan (eğer varsa)
+                row = {
+                    "plate_text": paddleocr_text,
+                    "image_path": final_image_url  # S3 URL veya local URL
+                }
+
+                # Response (orijinal format) - id ve detected_at commit sonrası doldurulur
+                pending.append((row, {
+                    "id": None,
+                    "text": cleaned_text,
+                    "bbox": bbox,
+                    "detection_confidence": round(confidence, 3),
+                    "confidence": ensemble_confidence,
+                    "ocr_confidence": ensemble_confidence,
+                    "ocr_easyocr": ocr_results['easyocr'],
+                    "ocr_easyocr_confidence": round(ocr_results['easyocr_confidence'], 3),
+                    "ocr_easyocr_time": round(ocr_results['easyocr_processing_time'], 3),
+                    "ocr_paddleocr": ocr_results['paddleocr'],
+                    "ocr_paddleocr_confidence": round(ocr_results['paddleocr_confidence'], 3),
+                    "ocr_paddleocr_time": round(ocr_results['paddleocr_processing_time'], 3),
+                    "ensemble": cleaned_text,
+                    "ensemble_source": ocr_results['ensemble_source'],
+                    "image_url": final_image_url,  # S3 URL (preferred) or local URL
+                    "image_path": relative_path,
+                    "detected_at": None
+                }))
+
+            except Exception as e:
+                logger.warning(f"Error processing plate {i}: {e}")
+                continue
+
+        if pending:
+            saved = await asyncio.to_thread(save_records, db, [row for row, _ in pending])
+            for (record_id, detected_at), (_, plate) in zip(saved, pending):
+                plate["id"] = record_id
+                plate["detected_at"] = str(detected_at)
+                plates.append(plate)
+
+        # YOLO kutuları NMS'ten güvene göre azalan sırada gelir; sort çoğunlukla sıralı listeyi doğrular (O(n))
+        plates.sort(key=_by_detection_confidence, reverse=True)
+        total_processing_time = (time.perf_counter_ns() - total_start_time) / 1e9
         logger.info(f"Total plates detected: {len(plates)}")
         
-        return {
+        # Yanıt doğrudan orjson ile serileştirilir (FastAPI'nin jsonable_encoder geçişi atlanır)
+        return ORJSONResponse({
             "plates": plates,
             "processing_time": round(total_processing_time, 3)
-        }
+        })
 
     except Exception as e:
-        total_processing_time = time.time() - total_start_time
+        total_processing_time = (time.perf_counter_ns() - total_start_time) / 1e9
         logger.error(f"Prediction failed: {e}")
         
-        # Clean up local file if error occurs
+        # S3 upload'ı iptal et; hata öncesinde tamamlandıysa 500 dönen isteğin nesnesi S3'te kalmasın
+        if s3_task is not None:
+            s3_task.cancel()
+            (s3_upload,) = await asyncio.gather(s3_task, return_exceptions=True)
+            if isinstance(s3_upload, tuple):
+                await asyncio.to_thread(s3_manager.delete_image, s3_upload[0])
+
+        # Clean up local file if error occurs (arka plandaki yazımın bitmesini bekle)
+        if write_task is not None:
+            await asyncio.gather(write_task, return_exceptions=True)
         if local_image_path and os.path.exists(local_image_path):
             try:
                 os.remove(local_image_path)
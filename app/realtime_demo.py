@@ -5,41 +5,109 @@ import numpy as np
 from ultralytics import YOLO
 import easyocr
 import os
+import sys
+
+# Boşluk silme + O→0, I→1, B→8 düzeltmeleri için str.translate tablosu
+_PLATE_FIX_TABLE = str.maketrans({' ': None, 'O': '0', 'I': '1', 'B': '8'})
+
+# YOLO + OCR sadece her N. karede çalışır; aradaki karelerde kutular optik akışla kaydırılır
+DETECT_EVERY_N_FRAMES = 2
+_LK_PARAMS = dict(
+    winSize=(21, 21), maxLevel=2,
+    criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+)
+
+# Kare başına yeni dizi ayırmamak için tekrar kullanılan ara buffer'lar (crop boyutu değişince yenilenir).
+# Demo tek thread'de çalışır; dönen binary görüntü bir sonraki crop'a kadar geçerlidir
+_scratch = {'shape': None, 'gray': None, 'blur': None, 'bin': None}
+
+def _scratch_buffers(h, w):
+    if _scratch['shape'] != (h, w):
+        _scratch['shape'] = (h, w)
+        _scratch['gray'] = np.empty((h, w), dtype=np.uint8)
+        _scratch['blur'] = np.empty((h, w), dtype=np.uint8)
+        _scratch['bin'] = np.empty((h, w), dtype=np.uint8)
+    return _scratch['gray'], _scratch['blur'], _scratch['bin']
 
 def advanced_preprocess_plate(crop):
     """Gelişmiş OCR ön işleme fonksiyonu."""
     if crop is None or crop.size == 0:
         return None
+    gray, blur, binary = _scratch_buffers(*crop.shape[:2])
     # Griye çevir
-    gray = cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY)
-    # Histogram eşitleme
-    gray = cv2.equalizeHist(gray)
+    cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY, dst=gray)
+    # Histogram eşitleme (yerinde)
+    cv2.equalizeHist(gray, dst=gray)
     # Gürültü azaltma
-    blur = cv2.GaussianBlur(gray, (3, 3), 0)
+    cv2.GaussianBlur(gray, (3, 3), 0, dst=blur)
     # Adaptif threshold
-    binary = cv2.adaptiveThreshold(
+    cv2.adaptiveThreshold(
         blur, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-        cv2.THRESH_BINARY, 11, 2
+        cv2.THRESH_BINARY, 11, 2, dst=binary
     )
     return binary
 
 def clean_plate_text(text):
     """Plaka metninde sık yapılan OCR hatalarını düzeltir, formatlar."""
-    import re
     if not text:
         return ""
-    text = text.upper().replace(" ", "")
-    # Karışan harf/rakamları düzelt
-    text = (
-        text.replace('O', '0')
-            .replace('I', '1')
-            .replace('B', '8')
-    )
-    # Sadece Türk plaka formatına uygunsa dön
-    match = re.match(r'^[0-9]{2}[A-Z]{1,3}[0-9]{2,4}$', text)
-    if match:
-        return text
-    return text  # Uymuyorsa en yakın sonucu döndür
+    # Boşlukları sil ve karışan harf/rakamları düzelt (tek geçişte)
+    return text.upper().translate(_PLATE_FIX_TABLE)
+
+def open_camera(index=0):
+    """Düşük gecikmeli kamera: platforma uygun backend, 1 karelik iç buffer, MJPG akışı."""
+    if os.name == 'nt':
+        backend = cv2.CAP_DSHOW
+    elif sys.platform.startswith('linux'):
+        backend = cv2.CAP_V4L2
+    else:
+        backend = cv2.CAP_ANY
+    cap = cv2.VideoCapture(index, backend)
+    if not cap.isOpened():
+        cap = cv2.VideoCapture(index)  # Backend desteklenmiyorsa varsayılana dön
+    cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+    cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+    return cap
+
+def detect_plates(model, reader, frame):
+    """Karedeki plakaları tespit edip okur; [((x1, y1, x2, y2), plaka), ...] döndürür."""
+    results = model(frame)
+    boxes = results[0].boxes
+    if boxes is None or not len(boxes):
+        return []
+    # Koordinatlar cihazda int32'ye çevrilip tek seferde küçük (N, 4) dizi olarak kopyalanır
+    coords = boxes.xyxy.int().cpu().tolist()
+    tracks = []
+    for x1, y1, x2, y2 in coords:
+        crop = frame[y1:y2, x1:x2]
+        processed = advanced_preprocess_plate(crop)
+        plate = ""
+        if processed is not None:
+            ocr_result = reader.readtext(
+                processed,
+                allowlist="0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+                detail=0,
+                paragraph=False
+            )
+            plate = clean_plate_text(ocr_result[0]) if ocr_result else ""
+        tracks.append(((x1, y1, x2, y2), plate))
+    return tracks
+
+def track_plates(prev_gray, gray, tracks):
+    """Kutu merkezlerini Lucas-Kanade optik akışıyla takip edip kutuları kaydırır; kaybolanlar düşer."""
+    centers = np.array(
+        [[(x1 + x2) / 2, (y1 + y2) / 2] for (x1, y1, x2, y2), _ in tracks], dtype=np.float32
+    ).reshape(-1, 1, 2)
+    new_centers, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, centers, None, **_LK_PARAMS)
+    moved = []
+    for ((x1, y1, x2, y2), plate), old, new, found in zip(
+        tracks, centers.reshape(-1, 2), new_centers.reshape(-1, 2), status.ravel()
+    ):
+        if not found:
+            continue
+        dx, dy = (int(round(d)) for d in (new - old))
+        moved.append(((x1 + dx, y1 + dy, x2 + dx, y2 + dy), plate))
+    return moved
 
 def main():
     # Model ve OCR başlat
@@ -50,32 +118,30 @@ def main():
     model = YOLO(model_path)
     reader = easyocr.Reader(['en'], gpu=False)
 
-    cap = cv2.VideoCapture(0)  # Bilgisayar kamerası
+    cap = open_camera(0)  # Bilgisayar kamerası
     print("Başlamak için kameraya bakın. Çıkmak için Q'ya basın.")
 
+    frame_id = 0
+    tracks = []
+    prev_gray = None
     while True:
         ret, frame = cap.read()
         if not ret:
             break
 
-        # YOLO ile plaka tespiti
-        results = model(frame)
-        boxes = results[0].boxes.xyxy.cpu().numpy() if results[0].boxes is not None else []
-
-        for box in boxes:
-            x1, y1, x2, y2 = map(int, box)
-            crop = frame[y1:y2, x1:x2]
-            processed = advanced_preprocess_plate(crop)
-            plate = ""
-            if processed is not None:
-                ocr_result = reader.readtext(
-                    processed,
-                    allowlist="0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ",
-                    detail=0,
-                    paragraph=False
-                )
-                plate = clean_plate_text(ocr_result[0]) if ocr_result else ""
-            # Görüntüye kutu ve plaka yazısını ekle
+        if frame_id % DETECT_EVERY_N_FRAMES == 0:
+            # YOLO ile plaka tespiti + OCR
+            tracks = detect_plates(model, reader, frame)
+            prev_gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if tracks else None
+        elif tracks:
+            # Ara kare: önceki kutuları ve okunan plakaları optik akışla taşı
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            tracks = track_plates(prev_gray, gray, tracks)
+            prev_gray = gray
+        frame_id += 1
+
+        # Görüntüye kutu ve plaka yazısını ekle
+        for (x1, y1, x2, y2), plate in tracks:
             cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
             cv2.putText(frame, plate, (x1, y1-10), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
 
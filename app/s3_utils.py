@@ -2,8 +2,9 @@
 
 import boto3
 import logging
+import threading
+from botocore.config import Config
 from botocore.exceptions import ClientError, NoCredentialsError, BotoCoreError
-from io import BytesIO
 from typing import Optional, Tuple
 import uuid
 import os
@@ -27,7 +28,19 @@ class S3Manager:
         self.region = AWS_S3_REGION
         self.base_url = AWS_S3_BASE_URL
         self._client = None
-        self._initialize_client()
+        self._lock = threading.Lock()
+    
+    @property
+    def client(self):
+        """
+        S3 client'ı ilk kullanımda oluştur (head_bucket kontrolü process başına bir kez).
+        Import sırasında ağ çağrısı yapılmaz; S3 ayarlı değilse uygulama yine açılır.
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._initialize_client()
+        return self._client
     
     def _initialize_client(self):
         """Initialize S3 client with error handling"""
@@ -35,15 +48,18 @@ class S3Manager:
             if not all([AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY, AWS_S3_BUCKET_NAME, AWS_S3_REGION]):
                 raise APIException("AWS S3 credentials not properly configured", 500)
             
-            self._client = boto3.client(
+            client = boto3.client(
                 's3',
                 aws_access_key_id=AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-                region_name=AWS_S3_REGION
+                region_name=AWS_S3_REGION,
+                # Eşzamanlı upload'lar için daha büyük bağlantı havuzu, geçici hatalarda adaptif retry
+                config=Config(max_pool_connections=50, retries={'max_attempts': 3, 'mode': 'adaptive'})
             )
             
             # Test connection by checking if bucket exists
-            self._client.head_bucket(Bucket=self.bucket_name)
+            client.head_bucket(Bucket=self.bucket_name)
+            self._client = client
             logger.info(f"S3 client initialized successfully for bucket: {self.bucket_name}")
             
         except NoCredentialsError:
@@ -77,6 +93,28 @@ class S3Manager:
         s3_key = f"plates/{date_path}/{unique_filename}"
         return s3_key
     
+    def resolve_content_type(self, filename: str, content_type: str = None) -> str:
+        """Determine content type from the file extension if not provided"""
+        if content_type:
+            return content_type
+        ext = os.path.splitext(filename)[1].lower()
+        content_type_map = {
+            '.jpg': 'image/jpeg',
+            '.jpeg': 'image/jpeg',
+            '.png': 'image/png',
+            '.bmp': 'image/bmp',
+            '.tiff': 'image/tiff',
+            '.webp': 'image/webp'
+        }
+        return content_type_map.get(ext, 'image/jpeg')
+    
+    def _build_metadata(self, filename: str) -> dict:
+        return {
+            'original_filename': filename,
+            'upload_timestamp': datetime.utcnow().isoformat(),
+            'service': 'plaka-tespit-api'
+        }
+    
     def upload_image(self, image_bytes: bytes, filename: str, content_type: str = None) -> Tuple[str, str]:
         """
         Upload image to S3 and return S3 key and public URL
@@ -93,31 +131,14 @@ class S3Manager:
             # Generate S3 key
             s3_key = self.generate_s3_key(filename)
             
-            # Determine content type if not provided
-            if not content_type:
-                ext = os.path.splitext(filename)[1].lower()
-                content_type_map = {
-                    '.jpg': 'image/jpeg',
-                    '.jpeg': 'image/jpeg',
-                    '.png': 'image/png',
-                    '.bmp': 'image/bmp',
-                    '.tiff': 'image/tiff',
-                    '.webp': 'image/webp'
-                }
-                content_type = content_type_map.get(ext, 'image/jpeg')
-            
             # Upload to S3
-            self._client.put_object(
+            self.client.put_object(
                 Bucket=self.bucket_name,
                 Key=s3_key,
-                Body=BytesIO(image_bytes),
-                ContentType=content_type,
+                Body=image_bytes,
+                ContentType=self.resolve_content_type(filename, content_type),
                 ACL='public-read',  # Make images publicly accessible
-                Metadata={
-                    'original_filename': filename,
-                    'upload_timestamp': datetime.utcnow().isoformat(),
-                    'service': 'plaka-tespit-api'
-                }
+                Metadata=self._build_metadata(filename)
             )
             
             # Generate public URL
@@ -134,6 +155,46 @@ class S3Manager:
             logger.error(f"Unexpected error during S3 upload: {e}")
             raise APIException(f"Failed to upload image to S3: {str(e)}", 500)
     
+    def upload_image_file(self, file_path: str, filename: str, content_type: str = None) -> Tuple[str, str]:
+        """
+        Upload an image already saved on disk to S3 and return S3 key and public URL.
+        The file is streamed by boto3 (multipart for large files) instead of being held in memory.
+        
+        Args:
+            file_path: Local path of the image file
+            filename: Original filename (used for extension)
+            content_type: MIME type of the image
+            
+        Returns:
+            Tuple of (s3_key, public_url)
+        """
+        try:
+            s3_key = self.generate_s3_key(filename)
+            
+            self.client.upload_file(
+                file_path,
+                self.bucket_name,
+                s3_key,
+                ExtraArgs={
+                    'ContentType': self.resolve_content_type(filename, content_type),
+                    'ACL': 'public-read',  # Make images publicly accessible
+                    'Metadata': self._build_metadata(filename)
+                }
+            )
+            
+            public_url = self.get_image_url(s3_key)
+            
+            logger.info(f"Successfully uploaded image to S3: {s3_key}")
+            return s3_key, public_url
+            
+        except ClientError as e:
+            error_code = e.response['Error']['Code']
+            logger.error(f"S3 upload failed with error {error_code}: {e}")
+            raise APIException(f"Failed to upload image to S3: {error_code}", 500)
+        except Exception as e:
+            logger.error(f"Unexpected error during S3 upload: {e}")
+            raise APIException(f"Failed to upload image to S3: {str(e)}", 500)
+    
     def delete_image(self, s3_key: str) -> bool:
         """
         Delete image from S3
@@ -145,7 +206,7 @@ class S3Manager:
             True if successful, False otherwise
         """
         try:
-            self._client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+            self.client.delete_object(Bucket=self.bucket_name, Key=s3_key)
             logger.info(f"Successfully deleted image from S3: {s3_key}")
             return True
         except ClientError as e:
@@ -162,7 +223,7 @@ class S3Manager:
     def check_image_exists(self, s3_key: str) -> bool:
         """Check if image exists in S3"""
         try:
-            self._client.head_object(Bucket=self.bucket_name, Key=s3_key)
+            self.client.head_object(Bucket=self.bucket_name, Key=s3_key)
             return True
         except ClientError:
             return False
@@ -2,16 +2,45 @@ import os
 import cv2
 import numpy as np
 from pathlib import Path
-from PIL import Image, ExifTags
+from PIL import Image
 import io
 import logging
+import hashlib
+import threading
+from collections import OrderedDict
 from .config import (
-    MAX_FILE_SIZE, ALLOWED_EXTENSIONS, MAX_IMAGE_DIMENSION
+    MAX_FILE_SIZE, ALLOWED_EXTENSIONS, MAX_IMAGE_DIMENSION, DECODE_CACHE_SIZE
 )
 from .exceptions import InvalidImageError, FileSizeError
 
 logger = logging.getLogger(__name__)
 
+# (Opsiyonel) libjpeg-turbo ile SIMD hızlandırılmış JPEG çözme
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB, TJPF_BGR
+    _turbo_jpeg = TurboJPEG()
+except Exception:  # Paket veya native kütüphane yoksa PIL kullanılır
+    _turbo_jpeg = None
+
+JPEG_MAGIC = b'\xff\xd8\xff'
+# İzin verilen formatların dosya başı imzaları (magic bytes)
+PNG_MAGIC = b'\x89PNG\r\n\x1a\n'
+BMP_MAGIC = b'BM'
+TIFF_MAGICS = (b'II*\x00', b'MM\x00*')
+EXIF_ORIENTATION_TAG = 0x0112
+# EXIF Orientation değeri -> cv2.rotate kodu (ndarray yolunda)
+ORIENTATION_CV2_ROTATE = {
+    3: cv2.ROTATE_180,
+    6: cv2.ROTATE_90_CLOCKWISE,
+    8: cv2.ROTATE_90_COUNTERCLOCKWISE,
+}
+# EXIF Orientation değeri -> PIL transpose işlemi (PIL yolunda)
+ORIENTATION_TRANSPOSE = {
+    3: Image.Transpose.ROTATE_180,
+    6: Image.Transpose.ROTATE_270,
+    8: Image.Transpose.ROTATE_90,
+}
+
 def validate_image(file_content: bytes, filename: str) -> None:
     """
     Yüklenen görselin format ve boyut kontrolü yapar.
@@ -24,63 +53,201 @@ def validate_image(file_content: bytes, filename: str) -> None:
     if file_ext not in ALLOWED_EXTENSIONS:
         raise InvalidImageError(f"Unsupported file type. Allowed: {', '.join(ALLOWED_EXTENSIONS)}")
     
-    try:
-        image = Image.open(io.BytesIO(file_content))
-        image.verify()  # Görselin geçerli ve bozuk olmadığını kontrol eder
-    except Exception:
+    # Görsel burada çözülmez; sadece başlık imzası kontrol edilir.
+    # Bozuk piksel verisi preprocess_image(_bgr) içindeki çözme sırasında InvalidImageError olur
+    if _sniff_format(file_content) is None:
         raise InvalidImageError("Invalid or corrupted image file")
 
+def _sniff_format(file_content: bytes):
+    """Dosya başındaki imzadan görsel formatını bul (ALLOWED_EXTENSIONS'taki formatlar), yoksa None"""
+    if file_content[:3] == JPEG_MAGIC:
+        return "jpeg"
+    if file_content[:8] == PNG_MAGIC:
+        return "png"
+    if file_content[:4] == b'RIFF' and file_content[8:12] == b'WEBP':
+        return "webp"
+    if file_content[:4] in TIFF_MAGICS:
+        return "tiff"
+    if file_content[:2] == BMP_MAGIC:
+        return "bmp"
+    return None
+
 def correct_orientation(image: Image.Image) -> Image.Image:
     """
     Görselin EXIF metadata'sına bakarak yönünü düzeltir.
     Bazı cihazlarda fotoğrafın oryantasyonu metadata ile saklanır.
     """
     try:
-        exif = image._getexif()
-        if exif:
-            for tag, value in exif.items():
-                if tag in ExifTags.TAGS and ExifTags.TAGS[tag] == 'Orientation':
-                    if value == 3:
-                        image = image.rotate(180, expand=True)
-                    elif value == 6:
-                        image = image.rotate(270, expand=True)
-                    elif value == 8:
-                        image = image.rotate(90, expand=True)
+        # Orientation etiketi doğrudan id'siyle okunur; tüm etiketler taranmaz
+        transpose = ORIENTATION_TRANSPOSE.get(image.getexif().get(EXIF_ORIENTATION_TAG))
     except (AttributeError, KeyError):
         # EXIF verisi yoksa veya işlenemezse, hata vermez
-        pass
-    return image
+        return image
+    # transpose yeniden örnekleme yapmadan sadece pikselleri yer değiştirir (rotate'in hızlı karşılığı)
+    return image.transpose(transpose) if transpose is not None else image
+
+# cv2.imdecode'un çözme sırasında küçültme bayrakları (TurboJPEG scaling_factor karşılığı)
+CV2_REDUCED_COLOR_FLAGS = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+def _jpeg_scale_denominator(max_dimension: int) -> int:
+    """Hedef boyutun altına düşmeyen en küçük ölçek faktörünün paydasını seç (1, 2, 4, 8)"""
+    scale = 1
+    for denom in (2, 4, 8):
+        if max_dimension // denom < MAX_IMAGE_DIMENSION:
+            break
+        scale = denom
+    return scale
+
+def _fit_and_orient(image_np: np.ndarray, orientation) -> np.ndarray:
+    """Kalan küçültmeyi PIL yolundaki ile aynı sınıra göre yap ve EXIF oryantasyonunu uygula"""
+    h, w = image_np.shape[:2]
+    if max(h, w) > MAX_IMAGE_DIMENSION:
+        ratio = MAX_IMAGE_DIMENSION / max(h, w)
+        new_size = (int(w * ratio), int(h * ratio))
+        logger.info(f"Resizing image from {(w, h)} to {new_size} for processing")
+        image_np = cv2.resize(image_np, new_size, interpolation=cv2.INTER_AREA)
+
+    rotate_code = ORIENTATION_CV2_ROTATE.get(orientation)
+    if rotate_code is not None:
+        # cv2.rotate yeniden örnekleme yapmadan transpose/flip ile tek geçişte contiguous çıktı üretir
+        image_np = cv2.rotate(image_np, rotate_code)
+    return image_np
+
+def decode_jpeg_turbo(image_bytes: bytes, bgr: bool = False) -> np.ndarray:
+    """
+    JPEG görseli TurboJPEG ile doğrudan RGB (bgr=True ise BGR) NumPy array'e çözer.
+    Görsel MAX_IMAGE_DIMENSION'dan çok büyükse, çözme sırasında
+    ölçekleme (1/2, 1/4, 1/8) yapılarak ayrı bir küçültme adımı önlenir.
+    EXIF oryantasyonu (sadece başlık okunarak) uygulanır.
+    """
+    width, height, _, _ = _turbo_jpeg.decode_header(image_bytes)
+    scaling_factor = (1, _jpeg_scale_denominator(max(width, height)))
+
+    pixel_format = TJPF_BGR if bgr else TJPF_RGB
+    image_np = _turbo_jpeg.decode(image_bytes, pixel_format=pixel_format, scaling_factor=scaling_factor)
 
-def optimize_for_processing(image: Image.Image) -> Image.Image:
+    # Image.open sadece başlığı okur; piksel verisi çözülmez
+    orientation = Image.open(io.BytesIO(image_bytes)).getexif().get(EXIF_ORIENTATION_TAG)
+    return _fit_and_orient(image_np, orientation)
+
+def decode_image_cv2(image_bytes: bytes):
     """
-    Çok büyük görsellerin işlem yükünü azaltmak için 
-    maksimum bir boyuta göre orantılı küçültme yapar.
+    Görseli cv2.imdecode ile (JPEG'de OpenCV'nin libjpeg-turbo'su) doğrudan BGR'ye çözer;
+    PIL ile tam çözme, RGB'ye çevirme ve yeniden boyutlandırma kopyaları oluşmaz.
+    Büyük JPEG'ler çözme sırasında IMREAD_REDUCED_* ile küçültülür, kalan küçültme INTER_AREA ile yapılır.
+    EXIF oryantasyonu sadece başlıktan okunup TurboJPEG yoluyla aynı şekilde uygulanır
+    (TIFF hariç: onu OpenCV decoder'ı zaten uygular).
+    OpenCV formatı çözemezse None döner (çağıran PIL yoluna düşer).
     """
-    original_size = image.size
-    max_dimension = max(original_size)
-    if max_dimension > MAX_IMAGE_DIMENSION:
-        ratio = MAX_IMAGE_DIMENSION / max_dimension
-        new_size = (int(original_size[0] * ratio), int(original_size[1] * ratio))
-        logger.info(f"Resizing image from {original_size} to {new_size} for processing")
-        image = image.resize(new_size, Image.Resampling.LANCZOS)
-    return image
+    # Image.open sadece başlığı okur; boyut ve EXIF için piksel verisi çözülmez
+    header = Image.open(io.BytesIO(image_bytes))
+    scale = _jpeg_scale_denominator(max(header.size)) if image_bytes[:3] == JPEG_MAGIC else 1
+    image_np = cv2.imdecode(
+        np.frombuffer(image_bytes, dtype=np.uint8),
+        CV2_REDUCED_COLOR_FLAGS[scale] | cv2.IMREAD_IGNORE_ORIENTATION
+    )
+    if image_np is None:
+        return None
+    if image_bytes[:4] in TIFF_MAGICS:
+        # OpenCV'nin TIFF decoder'ı IMREAD_IGNORE_ORIENTATION'a rağmen oryantasyonu kendisi uygular;
+        # burada tekrar döndürülürse görsel iki kez döner
+        orientation = None
+    else:
+        orientation = header.getexif().get(EXIF_ORIENTATION_TAG)
+    return _fit_and_orient(image_np, orientation)
+
+def _decode_bgr(image_bytes: bytes) -> np.ndarray:
+    """
+    cv2 ile BGR'ye çöz; OpenCV'nin desteklemediği bir varyantta PIL ile çöz.
+    PIL yolunda görsel bir kez ndarray'e alınır; küçültme de (gerekirse) bu dizi üzerinde yapılır,
+    PIL -> ndarray -> PIL -> ndarray gidiş-dönüşü olmaz.
+    """
+    image_np = decode_image_cv2(image_bytes)
+    if image_np is None:
+        image = correct_orientation(Image.open(io.BytesIO(image_bytes))).convert("RGB")
+        image_np = _fit_and_orient(np.asarray(image), None)
+        image_np = cv2.cvtColor(image_np, cv2.COLOR_RGB2BGR)
+    return image_np
 
 def preprocess_image(image_bytes: bytes) -> tuple[Image.Image, np.ndarray]:
     """
     Ham bayt olarak gelen görseli,
-    - PIL Image formatına dönüştürür,
+    - NumPy array'e çözer (JPEG: TurboJPEG, diğerleri: cv2.imdecode),
     - Oryantasyonunu düzeltir,
-    - RGB'ye çevirir,
     - Optimizasyon için boyutlandırır,
-    - NumPy array formatına çevirir ve
+    - RGB'ye çevirir,
+    - PIL Image görünümünü oluşturur ve
     ikisini tuple olarak döner.
     """
     try:
-        image = Image.open(io.BytesIO(image_bytes))
-        image = correct_orientation(image)
-        image = image.convert("RGB")
-        image = optimize_for_processing(image)
-        image_np = np.array(image)
-        return image, image_np
+        if _turbo_jpeg is not None and image_bytes[:3] == JPEG_MAGIC:
+            image_np = decode_jpeg_turbo(image_bytes)
+        else:
+            image_np = cv2.cvtColor(_decode_bgr(image_bytes), cv2.COLOR_BGR2RGB)
+        return Image.fromarray(image_np), image_np
     except Exception as e:
         raise InvalidImageError(f"Failed to process image: {str(e)}")
+
+def preprocess_image_bgr(image_bytes: bytes) -> np.ndarray:
+    """
+    preprocess_image ile aynı adımlar, ancak sonuç doğrudan YOLO/OpenCV'nin beklediği
+    BGR sırasında üretilir: JPEG'ler TurboJPEG ile, diğer formatlar (veya TurboJPEG yoksa
+    JPEG'ler de) cv2.imdecode ile doğrudan BGR'ye çözülür. RGB kopyası ve PIL nesnesi oluşturulmaz.
+    """
+    try:
+        if _turbo_jpeg is not None and image_bytes[:3] == JPEG_MAGIC:
+            return decode_jpeg_turbo(image_bytes, bgr=True)
+        return _decode_bgr(image_bytes)
+    except Exception as e:
+        raise InvalidImageError(f"Failed to process image: {str(e)}")
+
+class DecodedImageCache:
+    """
+    Dosya baytlarının hash'ine göre çözülmüş BGR görselleri tutan küçük, thread-safe LRU cache.
+    Dönen diziler paylaşıldığı için salt okunur işaretlenir; çağıranlar kopyalamadan değiştiremez.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(image_bytes: bytes) -> bytes:
+        return hashlib.blake2b(image_bytes, digest_size=16).digest()
+
+    def get(self, key):
+        with self._lock:
+            image_np = self._entries.get(key)
+            if image_np is not None:
+                self._entries.move_to_end(key)
+            return image_np
+
+    def put(self, key, image_np):
+        with self._lock:
+            self._entries[key] = image_np
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+decoded_image_cache = DecodedImageCache(DECODE_CACHE_SIZE)
+
+def load_image_bgr(image_bytes: bytes) -> np.ndarray:
+    """
+    preprocess_image_bgr'in cache'li hali (DECODE_CACHE_SIZE > 0 ise).
+    Cache'ten gelen veya cache'e giren dizi salt okunurdur.
+    """
+    if decoded_image_cache.maxsize <= 0:
+        return preprocess_image_bgr(image_bytes)
+    key = decoded_image_cache.make_key(image_bytes)
+    image_np = decoded_image_cache.get(key)
+    if image_np is None:
+        image_np = preprocess_image_bgr(image_bytes)
+        image_np.flags.writeable = False
+        decoded_image_cache.put(key, image_np)
+    return image_np
@@ -17,9 +17,18 @@ if __name__ == "__main__":
         port = 8000
     
     host = os.getenv("HOST", "0.0.0.0")
+
+    # Her worker YOLO + EasyOCR + PaddleOCR'ı ayrı yükler (~1GB+); varsayılan tek worker,
+    # belleği yeten ortamlarda WEB_CONCURRENCY ile artırılabilir (ör. çekirdek sayısının yarısı)
+    try:
+        workers = max(1, int(os.getenv("WEB_CONCURRENCY", 1)))
+    except (ValueError, TypeError):
+        logger.warning("Invalid WEB_CONCURRENCY environment variable, using 1 worker")
+        workers = 1
     
     logger.info(f"Starting License Plate Detection API on {host}:{port}")
     logger.info(f"PORT environment variable: {os.getenv('PORT', 'not set')}")
+    logger.info(f"Workers: {workers} (CPU count: {os.cpu_count()})")
     
     try:
         uvicorn.run(
@@ -27,7 +36,9 @@ if __name__ == "__main__":
             host=host,
             port=port,
             reload=False,  # Disable reload for production
-            workers=1,     # Single worker for better memory management
+            workers=workers,
+            loop="auto",   # uvloop kuruluysa onu kullanır (Windows'ta asyncio'ya düşer)
+            http="auto",   # httptools kuruluysa onu kullanır
             log_level="info",
             access_log=True
         )
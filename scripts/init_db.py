@@ -0,0 +1,18 @@
+# scripts/init_db.py
+# Veritabanı tablolarını oluşturur. Deploy sırasında bir kez çalıştırılır:
+#   python scripts/init_db.py
+
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import init_db
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+if __name__ == "__main__":
+    init_db()
+    logger.info("Database tables created")